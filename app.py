@@ -57,10 +57,15 @@ def load_data():
         # Merge variants with demographics
         merged_df = pd.merge(variants_df, demographics_df, on='mrn', how='left')
         
+        # Keep each patient's variants contiguous and cache one row per patient
+        merged_df = merged_df.sort_values('mrn', kind='stable').reset_index(drop=True)
+        unique_patients_df = merged_df.drop_duplicates('mrn', keep='first')
+        
         return {
             'demographics': demographics_df,
             'variants': variants_df,
             'merged': merged_df,
+            '_unique_patients': unique_patients_df,
             'protocols': protocols_df,
             'subjects': subjects_df,
             'interventions': interventions_df,
@@ -96,6 +101,13 @@ def summary_card(title, value, icon="📊"):
         """
     )
 
+def unique_patients_for(df):
+    """Return one row per patient for a filtered slice of data['merged']"""
+    patients = data['_unique_patients']
+    if len(df) == len(data['merged']):
+        return patients
+    return patients[patients['mrn'].isin(df['mrn'].unique())]
+
 def run_cypher_query(query, parameters=None):
     """Execute a Cypher query and return results"""
     with driver.session() as session:
@@ -511,13 +523,18 @@ def server(input: Inputs, output: Outputs, session: Session):
             'protocols': filtered_protocols
         }
     
+    # Reuse one Figure per session and redraw into its cleared axes
+    _age_fig, _age_ax = plt.subplots(figsize=(6, 4))
+    
     @output
     @render.plot
     def age_distribution():
-        fig, ax = plt.subplots(figsize=(6, 4))
+        _age_ax.clear()
+        _age_fig.set_dpi(matplotlib.rcParams['figure.dpi'])  # Undo the pixel-ratio DPI from the last render
+        fig, ax = _age_fig, _age_ax
         df = filtered_data()
         
-        unique_patients = df.drop_duplicates('mrn')
+        unique_patients = unique_patients_for(df)
         
         # Professional blue color
         ax.hist(unique_patients['age'], bins=20, color='#0068B1', 
@@ -535,7 +552,7 @@ def server(input: Inputs, output: Outputs, session: Session):
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig
     
     @output
@@ -555,8 +572,7 @@ def server(input: Inputs, output: Outputs, session: Session):
         ax.grid(True, alpha=0.3, axis='y')
         
         # Add value labels on bars
-        for i, v in enumerate(sex_counts.values):
-            ax.text(i, v + 1, str(v), ha='center', fontweight='bold')
+        ax.bar_label(bars, labels=[str(v) for v in sex_counts.values], padding=3, fontweight='bold')
         
         plt.tight_layout()
         return fig
@@ -819,10 +835,14 @@ def server(input: Inputs, output: Outputs, session: Session):
         return fig
     
     # UPDATED FUNCTION
+    _ae_fig, _ae_ax = plt.subplots(figsize=(7, 4))
+    
     @output
     @render.plot
     def ae_system_dist():
-        fig, ax = plt.subplots(figsize=(7, 4))
+        _ae_ax.clear()
+        _ae_fig.set_dpi(matplotlib.rcParams['figure.dpi'])  # Undo the pixel-ratio DPI from the last render
+        fig, ax = _ae_fig, _ae_ax
         
         # Use filtered data
         clinical_data = filtered_clinical_data()
@@ -859,8 +879,7 @@ def server(input: Inputs, output: Outputs, session: Session):
                            color=colors[:len(system_counts)], edgecolor='white', linewidth=1.5)
             
             # Add values
-            for i, v in enumerate(system_counts.values):
-                ax.text(v + 1, i, str(v), va='center', fontweight='500', fontsize=8)
+            ax.bar_label(bars, labels=[str(v) for v in system_counts.values], padding=3, fontweight='500', fontsize=8)
             
             ax.set_yticks(range(len(system_counts)))
             ax.set_yticklabels(labels, fontsize=9, fontweight='500')
@@ -870,9 +889,7 @@ def server(input: Inputs, output: Outputs, session: Session):
             ax.spines['right'].set_visible(False)
             ax.invert_yaxis()
         
-        # Adjust margins
-        plt.subplots_adjust(left=0.2)
-        plt.tight_layout()
+        fig.tight_layout()
         return fig
     
     @output
@@ -7,18 +7,22 @@ Comprehensive fixes for:
 """
 
 import re
+import hashlib
+from pathlib import Path
 
 print("🔧 Applying comprehensive fixes...")
 print("="*60)
 
-# Read current app.py
-with open('app.py', 'r') as f:
-    content = f.read()
+def content_hash(text):
+    """Short BLAKE2b digest used to detect whether app.py actually changed"""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
 
-# Backup
-with open('app.py.before_comprehensive_fixes', 'w') as f:
-    f.write(content)
-print("✅ Created backup: app.py.before_comprehensive_fixes")
+# Read current app.py in a single shot
+app_path = Path('app.py')
+backup_path = Path('app.py.before_comprehensive_fixes')
+original = app_path.read_text()
+content = original
+before = content_hash(original)
 
 # ════════════════════════════════════════════════════════════════
 # 1. Fix the patient count issue - ensure all patients are included by default
@@ -66,10 +70,15 @@ content = re.sub(pattern, filtered_data_fix, content, flags=re.DOTALL)
 
 print("\n📋 Fixing adverse events system plot...")
 
-ae_system_fix = '''    @output
+ae_system_fix = '''    # Reuse one Figure per session and redraw into its cleared axes
+    _ae_fig, _ae_ax = plt.subplots(figsize=(10, 7))
+    
+    @output
     @render.plot
     def ae_system_dist():
-        fig, ax = plt.subplots(figsize=(10, 7))
+        _ae_ax.clear()
+        _ae_fig.set_dpi(matplotlib.rcParams['figure.dpi'])  # Undo the pixel-ratio DPI from the last render
+        fig, ax = _ae_fig, _ae_ax
         
         system_counts = data['adverse_events']['ae_body_system'].value_counts().head(8)
         
@@ -98,8 +107,7 @@ ae_system_fix = '''    @output
                        color=colors[:len(system_counts)], edgecolor='white', linewidth=1.5)
         
         # Add values
-        for i, v in enumerate(system_counts.values):
-            ax.text(v + 1, i, str(v), va='center', fontweight='500')
+        ax.bar_label(bars, labels=[str(v) for v in system_counts.values], padding=3, fontweight='500')
         
         ax.set_yticks(range(len(system_counts)))
         ax.set_yticklabels(labels, fontsize=11, fontweight='500')
@@ -109,13 +117,11 @@ ae_system_fix = '''    @output
         ax.spines['right'].set_visible(False)
         ax.invert_yaxis()
         
-        # Adjust margins
-        plt.subplots_adjust(left=0.2)
-        plt.tight_layout()
+        fig.tight_layout()
         return fig'''
 
 # Replace ae_system_dist function
-ae_pattern = r'@output\s*\n\s*@render\.plot\s*\n\s*def ae_system_dist\(\):.*?return fig'
+ae_pattern = r'[ \t]*(?:# Reuse one Figure[^\n]*\n\s*)?(?:_ae_fig, _ae_ax = [^\n]*\n\s*)?@output\s*\n\s*@render\.plot\s*\n\s*def ae_system_dist\(\):.*?return fig'
 content = re.sub(ae_pattern, ae_system_fix, content, flags=re.DOTALL)
 
 # ════════════════════════════════════════════════════════════════
@@ -148,13 +154,17 @@ content = re.sub(grade_colors_pattern, grade_colors_replacement, content)
 # 4. Fix the age distribution plot
 # ════════════════════════════════════════════════════════════════
 
-age_dist_fix = '''    @output
+age_dist_fix = '''    _age_fig, _age_ax = plt.subplots(figsize=(9, 6))
+    
+    @output
     @render.plot
     def age_distribution():
-        fig, ax = plt.subplots(figsize=(9, 6))
+        _age_ax.clear()
+        _age_fig.set_dpi(matplotlib.rcParams['figure.dpi'])  # Undo the pixel-ratio DPI from the last render
+        fig, ax = _age_fig, _age_ax
         df = filtered_data()
         
-        unique_patients = df.drop_duplicates('mrn')
+        unique_patients = unique_patients_for(df)
         
         # Professional blue color
         ax.hist(unique_patients['age'], bins=20, color='#0068B1', 
@@ -172,19 +182,25 @@ age_dist_fix = '''    @output
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig'''
 
 # Replace age_distribution function
-age_pattern = r'@output\s*\n\s*@render\.plot\s*\n\s*def age_distribution\(\):.*?return fig'
+age_pattern = r'[ \t]*(?:_age_fig, _age_ax = [^\n]*\n\s*)?@output\s*\n\s*@render\.plot\s*\n\s*def age_distribution\(\):.*?return fig'
 content = re.sub(age_pattern, age_dist_fix, content, flags=re.DOTALL)
 
 # ════════════════════════════════════════════════════════════════
 # 5. Write the updated file
 # ════════════════════════════════════════════════════════════════
 
-with open('app.py', 'w') as f:
-    f.write(content)
+if content_hash(content) == before:
+    print("\nℹ️  app.py already has these fixes - nothing to write")
+else:
+    # Backup once so re-runs keep the original pre-fix version
+    if not backup_path.exists():
+        backup_path.write_text(original)
+        print("✅ Created backup: app.py.before_comprehensive_fixes")
+    app_path.write_text(content)
 
 print("\n✅ All fixes applied successfully!")
 print("\n📋 Changes made:")
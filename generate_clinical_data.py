@@ -1,54 +1,50 @@
 import pandas as pd
 import numpy as np
 
+# Explicit dtypes for the demographics file so pandas skips type inference
+DEMOGRAPHIC_DTYPES = {'mrn': 'int32', 'age': 'int8', 'sex': 'category'}
+
+def sample_without_replacement(counts, choices):
+    """Pick counts[i] distinct choices for every row i, returning (row index, choice) arrays"""
+    choices = np.asarray(choices)
+    counts = np.minimum(counts, len(choices))
+    
+    # Ranking random keys gives each row an independent permutation of the choices
+    order = np.argsort(np.random.random((len(counts), len(choices))), axis=1)
+    rows, slots = np.nonzero(np.arange(len(choices)) < counts[:, None])
+    
+    return rows, choices[order[rows, slots]]
+
 def generate_protocols():
     """Generate synthetic protocol data as requested by mentors"""
     np.random.seed(42)
-    protocols = []
-    
-    # Create 50 protocols as suggested
-    for i in range(1, 51):
-        protocols.append({
-            'protocol_id': f"PROT_{i:03d}",
-            'protocol_name': f"Protocol {i}",
-            'phase': np.random.choice(['Phase I', 'Phase II', 'Phase III']),
-            'status': np.random.choice(['Active', 'Completed'], p=[0.7, 0.3])
-        })
-    
-    return pd.DataFrame(protocols)
+    
+    # Create 50 protocols as suggested, drawn column by column
+    n_protocols = 50
+    return pd.DataFrame({
+        'protocol_id': np.char.add('PROT_', np.char.zfill(np.arange(1, n_protocols + 1).astype(str), 3)),
+        'protocol_name': np.char.add('Protocol ', np.arange(1, n_protocols + 1).astype(str)),
+        'phase': np.random.choice(['Phase I', 'Phase II', 'Phase III'], size=n_protocols),
+        'status': np.random.choice(['Active', 'Completed'], size=n_protocols, p=[0.7, 0.3])
+    })
 
 def generate_clinical_trial_subjects(demo_df):
     """Generate RAVE_ID mappings (patient + protocol = RAVE_ID)"""
     np.random.seed(43)
     protocols_df = generate_protocols()
-    subjects = []
-    rave_counter = 1000
     
     print(f"Processing {len(demo_df)} patients with MRNs like: {demo_df['mrn'].head(3).tolist()}")
     
-    # Each patient can be enrolled in 0-3 protocols
-    for mrn in demo_df['mrn']:
-        n_enrollments = np.random.choice([0, 1, 2, 3], p=[0.3, 0.4, 0.2, 0.1])
-        
-        if n_enrollments > 0:
-            # Select random protocols for this patient
-            selected_protocols = np.random.choice(
-                protocols_df['protocol_id'], 
-                size=min(n_enrollments, len(protocols_df)), 
-                replace=False
-            )
-            
-            for protocol_id in selected_protocols:
-                rave_id = f"RAVE_{rave_counter}"
-                rave_counter += 1
-                subjects.append({
-                    'rave_id': rave_id,
-                    'mrn': int(mrn),  # Keep as integer to match your demographics file
-                    'protocol_id': protocol_id,
-                    'enrollment_status': np.random.choice(['Active', 'Completed', 'Withdrawn'], p=[0.5, 0.3, 0.2])
-                })
-    
-    return pd.DataFrame(subjects)
+    # Each patient can be enrolled in 0-3 distinct protocols, drawn for all patients at once
+    n_enrollments = np.random.choice([0, 1, 2, 3], size=len(demo_df), p=[0.3, 0.4, 0.2, 0.1])
+    rows, protocol_ids = sample_without_replacement(n_enrollments, protocols_df['protocol_id'])
+    
+    return pd.DataFrame({
+        'rave_id': np.char.add('RAVE_', np.arange(1000, 1000 + len(rows)).astype(str)),
+        'mrn': demo_df['mrn'].to_numpy(dtype=int)[rows],  # Keep as integer to match your demographics file
+        'protocol_id': protocol_ids,
+        'enrollment_status': np.random.choice(['Active', 'Completed', 'Withdrawn'], size=len(rows), p=[0.5, 0.3, 0.2])
+    })
 
 def generate_interventions(subjects_df):
     """Generate intervention data using categories from mentor feedback"""
@@ -60,26 +56,15 @@ def generate_interventions(subjects_df):
         'Radiation Therapy', 'Surgery', 'Stem Cell Transplant', 'Gene Therapy', 'Hormone Therapy'
     ]
     
-    interventions = []
-    
-    for _, subject in subjects_df.iterrows():
-        # Each subject gets 1-3 interventions
-        n_interventions = np.random.choice([1, 2, 3], p=[0.5, 0.3, 0.2])
-        
-        selected_interventions = np.random.choice(
-            intervention_categories, 
-            size=min(n_interventions, len(intervention_categories)), 
-            replace=False
-        )
-        
-        for intervention in selected_interventions:
-            interventions.append({
-                'rave_id': subject['rave_id'],
-                'intervention_category': intervention,
-                'dose_level': np.random.choice(['Low', 'Medium', 'High'])
-            })
-    
-    return pd.DataFrame(interventions)
+    # Each subject gets 1-3 interventions, drawn for all subjects at once
+    n_interventions = np.random.choice([1, 2, 3], size=len(subjects_df), p=[0.5, 0.3, 0.2])
+    rows, categories = sample_without_replacement(n_interventions, intervention_categories)
+    
+    return pd.DataFrame({
+        'rave_id': subjects_df['rave_id'].to_numpy()[rows],
+        'intervention_category': categories,
+        'dose_level': np.random.choice(['Low', 'Medium', 'High'], size=len(rows))
+    })
 
 def generate_adverse_events(subjects_df):
     """Generate adverse events using CTCAE body systems"""
@@ -101,33 +86,21 @@ def generate_adverse_events(subjects_df):
         'Skin and subcutaneous tissue disorders'
     ]
     
-    adverse_events = []
-    
-    for _, subject in subjects_df.iterrows():
-        # Each subject has 0-4 adverse events
-        n_aes = np.random.choice([0, 1, 2, 3, 4], p=[0.2, 0.3, 0.25, 0.15, 0.1])
-        
-        if n_aes > 0:
-            selected_aes = np.random.choice(
-                ae_body_systems, 
-                size=min(n_aes, len(ae_body_systems)), 
-                replace=False
-            )
-            
-            for ae_system in selected_aes:
-                adverse_events.append({
-                    'rave_id': subject['rave_id'],
-                    'ae_body_system': ae_system,
-                    'grade': np.random.choice([1, 2, 3, 4, 5], p=[0.4, 0.3, 0.2, 0.08, 0.02]),
-                    'serious': np.random.choice([True, False], p=[0.15, 0.85])
-                })
-    
-    return pd.DataFrame(adverse_events)
+    # Each subject has 0-4 adverse events, drawn for all subjects at once
+    n_aes = np.random.choice([0, 1, 2, 3, 4], size=len(subjects_df), p=[0.2, 0.3, 0.25, 0.15, 0.1])
+    rows, systems = sample_without_replacement(n_aes, ae_body_systems)
+    
+    return pd.DataFrame({
+        'rave_id': subjects_df['rave_id'].to_numpy()[rows],
+        'ae_body_system': systems,
+        'grade': np.random.choice([1, 2, 3, 4, 5], size=len(rows), p=[0.4, 0.3, 0.2, 0.08, 0.02]),
+        'serious': np.random.choice([True, False], size=len(rows), p=[0.15, 0.85])
+    })
 
 if __name__ == "__main__":
     # Load your existing demographics data - IMPORTANT: Use your actual MRNs!
     print("Loading your existing demographics data...")
-    demo_df = pd.read_csv("clean_demographics.csv")
+    demo_df = pd.read_csv("clean_demographics.csv", dtype=DEMOGRAPHIC_DTYPES)
     print(f"Found {len(demo_df)} patients with MRNs: {demo_df['mrn'].head().tolist()}...")
     
     # Generate all the clinical trial data using YOUR MRNs
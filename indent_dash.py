@@ -1,21 +1,26 @@
 from shiny import App, Inputs, Outputs, Session, render, ui, reactive
+import os
+
+# Keep matplotlib's font cache in one writable place instead of rebuilding it per start
+os.environ.setdefault('MPLCONFIGDIR', '/tmp/mpl-cache')
+import matplotlib
+matplotlib.use('Agg')  # Set backend before shiny or lifelines import pyplot
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pandas.api.types import union_categoricals
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import functools
 from neo4j import GraphDatabase
-import os
 from datetime import datetime
 import matplotlib.patches as patches
-from matplotlib.patches import Rectangle
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
 import warnings
-import io
-import base64
 warnings.filterwarnings('ignore')
 
 # Configure matplotlib for better rendering
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
 matplotlib.rcParams['figure.autolayout'] = False
 matplotlib.rcParams['figure.constrained_layout.use'] = False
 matplotlib.rcParams['figure.dpi'] = 100
@@ -30,36 +35,112 @@ matplotlib.rcParams['figure.max_open_warning'] = 50
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "")
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE")  # None uses the server's default database
+
+# Created on first use so the dashboard starts even when the database is down
+_driver = None
 
-driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+def get_driver():
+    """Return the shared Bolt driver, creating it on first call"""
+    global _driver
+    if _driver is None:
+        _driver = GraphDatabase.driver(
+            NEO4J_URI,
+            auth=(NEO4J_USER, NEO4J_PASSWORD),
+            max_connection_pool_size=50,
+            connection_acquisition_timeout=30,
+            keep_alive=True
+        )
+    return _driver
 
 # ═══════════════════════════════════════════════════════════════
 # DATA LOADING
 # ═══════════════════════════════════════════════════════════════
 
+# Explicit dtypes so pandas skips type inference when parsing the CSVs
+DTYPES = {
+    'mrn': 'int32', 'age': 'int8', 'allelefraction': 'float32', 'position': 'int32',
+    'grade': 'int8', 'duration_days': 'int16', 'target_enrollment': 'int16'
+}
+
+# Low-cardinality string columns stored as categoricals so filters compare integer codes
+CAT_COLS = [
+    'sex', 'gene', 'assessment', 'actionability', 'chromosome', 'protocol_id', 'phase', 'status',
+    'enrollment_status', 'intervention_category', 'dose_level', 'ae_body_system'
+]
+
+# Free-text columns (IDs, protein changes, dates) are mostly unique, so categories
+# don't pay off; Arrow strings store them in one contiguous buffer instead of per-row objects
+STRING = pd.ArrowDtype(pa.string())
+
+# Variants file candidates, in order of preference
+VARIANT_FILES = [
+    'variants_with_50_demo_mrn_200pts.csv',
+    'TSO500_Synthetic_Final.csv',
+    'variants_with_50_demo_mrn.csv'
+]
+
+def set_column_dtypes(df):
+    """Cast string columns to categories or Arrow strings, in place"""
+    # The category cast is a no-op for columns a Parquet copy already stores as categories
+    for col in df.columns:
+        if col in CAT_COLS:
+            df[col] = df[col].astype('category')
+        elif pd.api.types.is_string_dtype(df[col].dtype):
+            df[col] = df[col].astype(STRING)
+    return df
+
+def read_cached_csv(path):
+    """Read a CSV, keeping a Parquet copy next to it so later starts skip CSV parsing"""
+    parquet_path = path + '.parquet'
+    cached = os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(path)
+    if cached:
+        # The Memgraph loaders share these Parquet copies but write them without DTYPES
+        df = pd.read_parquet(parquet_path)
+        df = df.astype({col: dtype for col, dtype in DTYPES.items() if col in df.columns})
+    else:
+        df = pd.read_csv(path, dtype=DTYPES)
+    set_column_dtypes(df)
+    
+    if not cached:
+        df.to_parquet(parquet_path, index=False)
+    return df
+
 def load_data():
     """Load all CSV files"""
     try:
-        demographics_df = pd.read_csv('clean_demographics.csv')
-        variants_df = pd.read_csv('variants_with_50_demo_mrn_200pts.csv')
-        
-        # Try different filenames for variants
-        if not os.path.exists('variants_with_50_demo_mrn_200pts.csv'):
-            if os.path.exists('TSO500_Synthetic_Final.csv'):
-                variants_df = pd.read_csv('TSO500_Synthetic_Final.csv')
-            else:
-                variants_df = pd.read_csv('variants_with_50_demo_mrn.csv')
-        
-        protocols_df = pd.read_csv('protocols.csv')
-        subjects_df = pd.read_csv('clinical_trial_subjects.csv')
-        interventions_df = pd.read_csv('interventions.csv')
-        adverse_events_df = pd.read_csv('adverse_events.csv')
-        
-        # Merge variants with demographics
-        merged_df = pd.merge(variants_df, demographics_df, on='mrn', how='left')
+        demographics_df = read_cached_csv('clean_demographics.csv')
+        
+        # Use the first variants file that exists
+        variants_path = next((f for f in VARIANT_FILES if os.path.exists(f)), VARIANT_FILES[-1])
+        variants_df = read_cached_csv(variants_path)
+        
+        protocols_df = read_cached_csv('protocols.csv')
+        subjects_df = read_cached_csv('clinical_trial_subjects.csv')
+        interventions_df = read_cached_csv('interventions.csv')
+        adverse_events_df = read_cached_csv('adverse_events.csv')
+        
+        # Share one set of protocol categories so protocol_id joins stay categorical
+        protocol_ids = union_categoricals([protocols_df['protocol_id'], subjects_df['protocol_id']]).categories
+        protocols_df['protocol_id'] = protocols_df['protocol_id'].cat.set_categories(protocol_ids)
+        subjects_df['protocol_id'] = subjects_df['protocol_id'].cat.set_categories(protocol_ids)
+        
+        # Reuse the joined frame from a previous start unless either input CSV has changed since
+        merged_path = variants_path + '.merged.parquet'
+        source_mtime = max(os.path.getmtime(variants_path), os.path.getmtime('clean_demographics.csv'))
+        if os.path.exists(merged_path) and os.path.getmtime(merged_path) >= source_mtime:
+            merged_df = set_column_dtypes(pd.read_parquet(merged_path))
+        else:
+            # Join variants to demographics on the mrn index; each variant must match at most one patient
+            merged_df = variants_df.join(demographics_df.set_index('mrn'), on='mrn', how='left', validate='m:1')
+            merged_df.to_parquet(merged_path, index=False, compression='zstd')
+        
+        # One row per patient with variants, the same rows drop_duplicates('mrn') on merged_df gives
+        patients_df = demographics_df[demographics_df['mrn'].isin(variants_df['mrn'].unique())]
         
         return {
             'demographics': demographics_df,
+            'patients': patients_df.reset_index(drop=True),
             'variants': variants_df,
             'merged': merged_df,
             'protocols': protocols_df,
@@ -71,9 +152,101 @@ def load_data():
         print(f"Error loading data: {e}")
         return None
 
+def observed_counts(series):
+    """value_counts() without the zero rows a categorical reports for unused categories
+    
+    Counts are taken in first-appearance order and then sorted exactly as value_counts() does on plain
+    strings, so tied counts come out in the same order (on a categorical they would follow category order)
+    """
+    return series.groupby(series, observed=True, sort=False).size().sort_values(ascending=False)
+
 # Load data
 data = load_data()
 
+# Card values that don't depend on any filter, computed once at startup
+STATIC = {
+    'n_protocols': len(data['protocols']),
+    'n_interventions': data['interventions']['intervention_category'].nunique(),
+    'n_serious_ae': int((data['adverse_events']['serious'] == True).sum()),
+    'n_enrolled': data['subjects']['mrn'].nunique()
+}
+
+# Clinical trial plot counts; the trial tables aren't filtered, so these never change
+COUNTS = {
+    'protocol': observed_counts(data['subjects']['protocol_id']),
+    'intervention': observed_counts(data['interventions']['intervention_category']),
+    'grade': data['adverse_events']['grade'].value_counts().sort_index(),
+    'ae_system': observed_counts(data['adverse_events']['ae_body_system']).head(8),
+    'enrollment_status': observed_counts(data['subjects']['enrollment_status'])
+}
+
+# Distinct (mrn, intervention) and (mrn, protocol) pairs, joined once for the survival strata
+TRIAL_MRNS = {
+    'intervention': data['subjects'][['rave_id', 'mrn']].merge(
+        data['interventions'][['rave_id', 'intervention_category']], on='rave_id'
+    )[['mrn', 'intervention_category']].drop_duplicates(),
+    'protocol': data['subjects'][['mrn', 'protocol_id']].drop_duplicates()
+}
+
+# Filter choices, read off the category lists instead of scanning every row
+CHOICES = {
+    'gene': ["All"] + sorted(data['variants']['gene'].cat.categories),
+    'protocol': ["All"] + sorted(data['protocols']['protocol_id'].unique()),
+    'intervention': ["All"] + sorted(data['interventions']['intervention_category'].cat.categories)
+}
+
+# Fixed histogram bin edges: the age slider range and the allele fraction range
+AGE_BINS = np.linspace(18, 85, 21)
+AF_BINS = np.linspace(0, 1, 31)
+
+# Oncoprint cell colors; an assessment's code is its position here, unknown ones fall past the end
+ASSESSMENT_COLORS = {
+    'Pathogenic': '#e74c3c',
+    'Likely Pathogenic': '#f39c12',
+    'VUS': '#95a5a6',
+    'Likely Benign': '#3498db',
+    'Benign': '#2ecc71'
+}
+ASSESSMENT_INDEX = pd.Index(list(ASSESSMENT_COLORS))
+ONCOPRINT_CMAP = ListedColormap(list(ASSESSMENT_COLORS.values()) + ['gray'])
+
+# Much shorter AE body system labels; unlisted systems fall back to their first word
+AE_SYSTEM_LABELS = {
+    'Respiratory, thoracic and mediastinal disorders': 'Respiratory',
+    'Blood and lymphatic system disorders': 'Blood/Lymph',
+    'Cardiac disorders': 'Cardiac',
+    'Gastrointestinal disorders': 'GI',
+    'General disorders and administration site conditions': 'General',
+    'Hepatobiliary disorders': 'Hepatobiliary',
+    'Immune system disorders': 'Immune',
+    'Infections and infestations': 'Infections',
+    'Metabolism and nutrition disorders': 'Metabolism',
+    'Musculoskeletal and connective tissue disorders': 'Musculoskeletal',
+    'Nervous system disorders': 'Nervous',
+    'Skin and subcutaneous tissue disorders': 'Skin'
+}
+
+# Tick labels for the static count plots, in plotting order, built with vectorized string ops
+COUNT_LABELS = {
+    'intervention': pd.Series(COUNTS['intervention'].index[::-1].astype(str))
+        .str.replace(' Therapy', '', regex=False)
+        .str.replace('Angiogenesis Inhibitors', 'Angiogenesis Inh.', regex=False)
+        .str.replace('Immunotherapy', 'Immuno', regex=False)
+        .str.replace('Chemotherapy', 'Chemo', regex=False)
+        .tolist(),
+    'ae_system': pd.Series(COUNTS['ae_system'].index.astype(str))
+        .pipe(lambda systems: systems.map(AE_SYSTEM_LABELS).fillna(systems.str.split().str[0].str[:12]))
+        .tolist()
+}
+
+# Bar colors for the static count plots, indexed once: grade g takes GRADE_COLORS[g - 1]
+GRADE_COLORS = np.array(['#00A783', '#1881C2', '#FF9800', '#E83E48', '#8B0000'])
+AE_SYSTEM_COLORS = ('#E57373', '#EF5350', '#F44336', '#E53935', '#D32F2F', '#C62828', '#B71C1C', '#D50000')
+COUNT_COLORS = {
+    'grade': GRADE_COLORS[COUNTS['grade'].index.to_numpy() - 1],
+    'ae_system': AE_SYSTEM_COLORS[:len(COUNTS['ae_system'])]
+}
+
 # ═══════════════════════════════════════════════════════════════
 # HELPER FUNCTIONS
 # ═══════════════════════════════════════════════════════════════
@@ -97,6 +270,159 @@ def summary_card(title, value, icon="📊"):
         """
     )
 
+@functools.lru_cache(maxsize=32)
+def filter_merged(key):
+    """Apply a filter_key() tuple to the merged dataframe"""
+    sex_filter, age_range, gene_filter, assessment_filter = key
+    df = data['merged']
+    
+    # Combine every active filter into one mask and index once
+    mask = np.ones(len(df), dtype=bool)
+    
+    # Only apply filters if they're actually changed from defaults
+    # Demographics filters
+    if len(sex_filter) < 2:  # If not both selected
+        mask &= df['sex'].isin(sex_filter).to_numpy()
+    
+    # Age filter
+    if age_range[0] > 18 or age_range[1] < 85:  # If changed from default
+        mask &= df['age'].between(age_range[0], age_range[1]).to_numpy()
+    
+    # Gene filter
+    if gene_filter != "All":
+        mask &= (df['gene'] == gene_filter).to_numpy()
+    
+    # Assessment filter
+    if len(assessment_filter) < 5:  # If not all selected
+        mask &= df['assessment'].isin(assessment_filter).to_numpy()
+    
+    return df if mask.all() else df[mask]
+
+@functools.lru_cache(maxsize=32)
+def filter_patients(key):
+    """Apply a filter_key() tuple to the one-row-per-patient frame"""
+    sex_filter, age_range, gene_filter, assessment_filter = key
+    patients = data['patients']
+    mask = np.ones(len(patients), dtype=bool)
+    
+    if len(sex_filter) < 2:
+        mask &= patients['sex'].isin(sex_filter).to_numpy()
+    
+    if age_range[0] > 18 or age_range[1] < 85:
+        mask &= patients['age'].between(age_range[0], age_range[1]).to_numpy()
+    
+    # Variant filters keep only patients with at least one matching variant
+    if gene_filter != "All" or len(assessment_filter) < 5:
+        mask &= patients['mrn'].isin(filter_merged(key)['mrn'].unique()).to_numpy()
+    
+    return patients if mask.all() else patients[mask]
+
+def reuse_figure(fig):
+    """Undo the pixel-ratio DPI Shiny applied when this figure was last rendered"""
+    fig.set_dpi(matplotlib.rcParams['figure.dpi'])
+    return fig
+
+# One long-lived Figure per plot output, cleared and redrawn on each render
+FIGS = {}
+
+def get_fig(name, figsize, **kwargs):
+    """Return the Figure and Axes kept for a plot output, with the axes cleared"""
+    fig = FIGS.get(name)
+    if fig is None:
+        fig = FIGS[name] = Figure(figsize=figsize, **kwargs)
+        fig.subplots()
+    
+    # Shiny resizes the figure to fit its output on every render
+    fig.set_size_inches(figsize)
+    ax = fig.axes[0]
+    ax.clear()
+    return reuse_figure(fig), ax
+
+# Figures below depend only on the filter key, so each one is drawn once per
+# filter combination and reused when the same filters come back
+
+@functools.lru_cache(maxsize=32)
+def sex_distribution_figure(key):
+    """Bar chart of patients per sex"""
+    fig = Figure(figsize=(8, 5), tight_layout=True)
+    ax = fig.subplots()
+    sex_counts = observed_counts(filter_patients(key)['sex'])
+    
+    colors = ['#0068B1', '#E83E48']
+    bars = ax.bar(sex_counts.index, sex_counts.values, color=colors, alpha=0.7, edgecolor='black')
+    ax.set_xlabel('Sex', fontsize=12)
+    ax.set_ylabel('Number of Patients', fontsize=12)
+    
+    ax.grid(True, alpha=0.3, axis='y')
+    
+    # Add value labels on bars
+    ax.bar_label(bars, labels=[str(v) for v in sex_counts.values], padding=3, fontweight='bold')
+    
+    fig.tight_layout(pad=2.0)
+    return fig
+
+@functools.lru_cache(maxsize=32)
+def assessment_pie_figure(key):
+    """Pie chart of variants per clinical assessment"""
+    fig = Figure(figsize=(6, 5), tight_layout=True)
+    ax = fig.subplots()
+    
+    counts = observed_counts(filter_merged(key)['assessment'])
+    colors = ['#E83E48', '#FF9800', '#6C757D', '#1881C2', '#00A783']
+    
+    wedges, texts, autotexts = ax.pie(counts.values, 
+                                       labels=counts.index, 
+                                       autopct='%1.1f%%',
+                                       colors=colors, 
+                                       startangle=90,
+                                       textprops={'fontsize': 8})
+    
+    # Adjust text sizes
+    for text in texts:
+        text.set_fontsize(9)
+    for autotext in autotexts:
+        autotext.set_fontsize(8)
+        autotext.set_color('white')
+        autotext.set_weight('bold')
+    
+    fig.tight_layout(pad=2.0)
+    return fig
+
+@functools.lru_cache(maxsize=32)
+def gene_bar_figure(key):
+    """Horizontal bar chart of the 10 most mutated genes"""
+    fig = Figure(figsize=(7, 5))
+    ax = fig.subplots()
+    
+    top_genes = observed_counts(filter_merged(key)['gene']).head(10)
+    ax.barh(top_genes.index[::-1], top_genes.values[::-1], color='#0068B1', alpha=0.7)
+    ax.set_xlabel('Number of Variants', fontsize=11)
+    ax.tick_params(axis='y', labelsize=9)
+    
+    ax.grid(True, alpha=0.3, axis='x')
+    
+    # Use tight_layout with extra padding on the left
+    fig.tight_layout()
+    fig.subplots_adjust(left=0.3)
+    return fig
+
+@functools.lru_cache(maxsize=64)
+def fit_survival_curves(strata):
+    """Kaplan-Meier fits of synthetic survival times for (label, n, scale, event rate) strata"""
+    from lifelines import KaplanMeierFitter
+    
+    # One seeded stream drawn stratum by stratum, as np.random.seed(42) gave before
+    rng = np.random.RandomState(42)
+    fits = []
+    for label, n_patients, scale, event_rate in strata:
+        times = rng.exponential(scale=scale, size=n_patients)
+        events = rng.binomial(1, event_rate, size=n_patients)
+        
+        kmf = KaplanMeierFitter()
+        kmf.fit(times, events, label=label)
+        fits.append(kmf)
+    return fits
+
 def plot_card(title, plot_func):
     """Create a card containing a plot"""
     return ui.div(
@@ -115,10 +441,17 @@ def plot_card(title, plot_func):
 
 def run_cypher_query(query, parameters=None):
     """Execute a Cypher query and return results"""
-    with driver.session() as session:
+    with get_driver().session(database=NEO4J_DATABASE) as session:
         result = session.run(query, parameters or {})
         return [record.data() for record in result]
 
+def run_cypher_batch(query, rows):
+    """Execute an `UNWIND $rows AS row ...` query for many rows in one round trip"""
+    with get_driver().session(database=NEO4J_DATABASE) as session:
+        return session.execute_read(
+            lambda tx: [record.data() for record in tx.run(query, rows=rows)]
+        )
+
 # ═══════════════════════════════════════════════════════════════
 # UI DEFINITION
 # ═══════════════════════════════════════════════════════════════
@@ -244,7 +577,7 @@ app_ui = ui.page_fluid(
                             ui.input_selectize(
                                 "gene_filter",
                                 "Filter by Gene:",
-                                choices=["All"] + sorted(data['variants']['gene'].unique().tolist()),
+                                choices=CHOICES['gene'],
                                 selected="All",
                                 multiple=False
                             ),
@@ -322,14 +655,14 @@ app_ui = ui.page_fluid(
                             ui.input_selectize(
                                 "protocol_filter",
                                 "Protocol:",
-                                choices=["All"] + sorted(data['protocols']['protocol_id'].unique().tolist()),
+                                choices=CHOICES['protocol'],
                                 selected="All",
                                 multiple=False
                             ),
                             ui.input_selectize(
                                 "intervention_filter",
                                 "Intervention Type:",
-                                choices=["All"] + sorted(data['interventions']['intervention_category'].unique().tolist()),
+                                choices=CHOICES['intervention'],
                                 selected="All",
                                 multiple=False
                             ),
@@ -451,50 +784,81 @@ def server(input: Inputs, output: Outputs, session: Session):
     # REACTIVE DATA FILTERING
     # ═══════════════════════════════════════════════════════════════
     
+    @reactive.Calc
+    def filter_key():
+        """Hashable snapshot of the variant filters, used as the cache key for plots"""
+        return (
+            tuple(input.demo_sex_filter()),
+            tuple(input.demo_age_filter()),
+            input.gene_filter(),
+            tuple(input.assessment_filter())
+        )
+    
     @reactive.Calc
     def filtered_data():
         """Apply filters to the merged dataframe"""
-        # Start with all merged data
-        filtered_df = data['merged'].copy()
+        return filter_merged(filter_key())
+    
+    @reactive.Calc
+    def filtered_patients():
+        """One row per patient matching the filters"""
+        return filter_patients(filter_key())
+    
+    @reactive.Calc
+    def filtered_mrns():
+        """Distinct mrns in the filtered variants, shared by the survival strata"""
+        return filtered_data()['mrn'].unique()
+    
+    @reactive.Calc
+    def gene_counts():
+        """Variant counts per gene in the filtered data, most mutated first"""
+        return observed_counts(filtered_data()['gene'])
+    
+    @reactive.Calc
+    def variant_agg():
+        """Summary numbers for the genomics cards, computed once per filter change"""
+        df = filtered_data()
         
-        # Only apply filters if they're actually changed from defaults
-        # Demographics filters
-        if len(input.demo_sex_filter()) < 2:  # If not both selected
-            filtered_df = filtered_df[filtered_df['sex'].isin(input.demo_sex_filter())]
-            
-        # Age filter
-        age_range = input.demo_age_filter()
-        if age_range[0] > 18 or age_range[1] < 85:  # If changed from default
-            filtered_df = filtered_df[
-                (filtered_df['age'] >= age_range[0]) & 
-                (filtered_df['age'] <= age_range[1])
-            ]
+        # Count non-null, non-empty actionability in one Arrow pass, no filtered frame built
+        actionability = pa.array(df['actionability'])
+        actionable = pc.and_(pc.is_valid(actionability), pc.not_equal(actionability, ''))
         
-        # Gene filter
-        if input.gene_filter() != "All":
-            filtered_df = filtered_df[filtered_df['gene'] == input.gene_filter()]
-            
-        # Assessment filter
-        if len(input.assessment_filter()) < 5:  # If not all selected
-            filtered_df = filtered_df[filtered_df['assessment'].isin(input.assessment_filter())]
-            
-        return filtered_df
+        return {
+            'n': len(df),
+            'genes': len(gene_counts()),
+            'assessment_counts': df.groupby('assessment', observed=True).size(),
+            'actionable': actionable.true_count
+        }
+    
+    @reactive.Calc
+    def oncoprint_matrix():
+        """Assessment codes for the top 10 genes x first 25 patients, NaN where there is no variant"""
+        df = filtered_data()
+        top_genes = gene_counts().head(10).index
+        gene_data = df[df['gene'].isin(top_genes)]
+        patients = gene_data['mrn'].unique()[:25]
+        
+        # One cell per (gene, patient) holding the first variant's assessment
+        hits = gene_data[gene_data['mrn'].isin(patients)].drop_duplicates(['gene', 'mrn'])
+        codes = np.full((len(top_genes), len(patients)), np.nan)
+        assessment_codes = ASSESSMENT_INDEX.get_indexer(hits['assessment'])
+        assessment_codes[assessment_codes < 0] = len(ASSESSMENT_COLORS)  # Unknown assessments in gray
+        codes[top_genes.get_indexer(hits['gene']), pd.Index(patients).get_indexer(hits['mrn'])] = assessment_codes
+        return top_genes, patients, codes
     
     @output
     @render.plot(alt="Age Distribution")
     def age_distribution():
-        plt.close('all')  # Close any existing figures
-        fig, ax = plt.subplots(figsize=(8, 5), tight_layout=True)
-        df = filtered_data()
-        
-        unique_patients = df.drop_duplicates('mrn')
+        fig, ax = get_fig('age_distribution', (8, 5), tight_layout=True)
+        patients = filtered_patients()
         
         # Professional blue color
-        ax.hist(unique_patients['age'], bins=20, color='#0068B1', 
-                alpha=0.8, edgecolor='white', linewidth=1.2)
+        counts, _ = np.histogram(patients['age'].to_numpy(dtype=np.float32), bins=AGE_BINS)
+        ax.bar(AGE_BINS[:-1], counts, width=np.diff(AGE_BINS), align='edge', color='#0068B1', 
+               alpha=0.8, edgecolor='white', linewidth=1.2)
         
         # Add mean line
-        mean_age = unique_patients['age'].mean()
+        mean_age = patients['age'].mean()
         ax.axvline(mean_age, color='#E83E48', linestyle='--', linewidth=2.5, alpha=0.8)
         ax.text(mean_age + 1, ax.get_ylim()[1] * 0.9, f'Mean: {mean_age:.1f}', 
                 color='#E83E48', fontweight='600', fontsize=11)
@@ -505,43 +869,23 @@ def server(input: Inputs, output: Outputs, session: Session):
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         
-        plt.tight_layout(pad=2.0)
+        fig.tight_layout(pad=2.0)
         return fig
     
     @output
     @render.plot(alt="Sex Distribution")
     def sex_distribution():
-        plt.close('all')
-        fig, ax = plt.subplots(figsize=(8, 5), tight_layout=True)
-        df = filtered_data()
-        
-        unique_patients = df.drop_duplicates('mrn')
-        sex_counts = unique_patients['sex'].value_counts()
-        
-        colors = ['#0068B1', '#E83E48']
-        bars = ax.bar(sex_counts.index, sex_counts.values, color=colors, alpha=0.7, edgecolor='black')
-        ax.set_xlabel('Sex', fontsize=12)
-        ax.set_ylabel('Number of Patients', fontsize=12)
-        
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        # Add value labels on bars
-        for i, v in enumerate(sex_counts.values):
-            ax.text(i, v + 1, str(v), ha='center', fontweight='bold')
-        
-        plt.tight_layout(pad=2.0)
-        return fig
+        return reuse_figure(sex_distribution_figure(filter_key()))
     
     @output
     @render.ui
     def demographics_summary():
-        df = filtered_data()
-        unique_patients = df.drop_duplicates('mrn')
+        patients = filtered_patients()
         
         return ui.div(
-            ui.p(f"Total Patients: {len(unique_patients)}", style="font-size: 16px;"),
-            ui.p(f"Average Age: {unique_patients['age'].mean():.1f} years", style="font-size: 16px;"),
-            ui.p(f"Age Range: {unique_patients['age'].min()} - {unique_patients['age'].max()} years", style="font-size: 16px;"),
+            ui.p(f"Total Patients: {len(patients)}", style="font-size: 16px;"),
+            ui.p(f"Average Age: {patients['age'].mean():.1f} years", style="font-size: 16px;"),
+            ui.p(f"Age Range: {patients['age'].min()} - {patients['age'].max()} years", style="font-size: 16px;"),
             style="background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);"
         )
     
@@ -552,83 +896,44 @@ def server(input: Inputs, output: Outputs, session: Session):
     @output
     @render.ui
     def total_variants_card():
-        df = filtered_data()
-        return summary_card("Total Variants", len(df), "🧬")
+        return summary_card("Total Variants", variant_agg()['n'], "🧬")
     
     @output
     @render.ui
     def unique_genes_card():
-        df = filtered_data()
-        return summary_card("Unique Genes", df['gene'].nunique(), "🧬")
+        return summary_card("Unique Genes", variant_agg()['genes'], "🧬")
     
     @output
     @render.ui
     def pathogenic_count_card():
-        df = filtered_data()
-        pathogenic = df[df['assessment'].isin(['Pathogenic', 'Likely Pathogenic'])]
-        return summary_card("Pathogenic", len(pathogenic), "⚠️")
+        counts = variant_agg()['assessment_counts']
+        n_pathogenic = counts.reindex(['Pathogenic', 'Likely Pathogenic'], fill_value=0).sum()
+        return summary_card("Pathogenic", n_pathogenic, "⚠️")
     
     @output
     @render.ui
     def actionable_count_card():
-        df = filtered_data()
-        actionable = df[df['actionability'].notna() & (df['actionability'] != '')]
-        return summary_card("Actionable", len(actionable), "💊")
+        return summary_card("Actionable", variant_agg()['actionable'], "💊")
     
     @output
     @render.plot(alt="Clinical Assessment Distribution")
     def assessment_pie():
-        plt.close('all')
-        fig, ax = plt.subplots(figsize=(6, 5), tight_layout=True)
-        df = filtered_data()
-        
-        assessment_counts = df['assessment'].value_counts()
-        colors = ['#E83E48', '#FF9800', '#6C757D', '#1881C2', '#00A783']
-        
-        wedges, texts, autotexts = ax.pie(assessment_counts.values, 
-                                           labels=assessment_counts.index, 
-                                           autopct='%1.1f%%',
-                                           colors=colors, 
-                                           startangle=90,
-                                           textprops={'fontsize': 8})
-        
-        # Adjust text sizes
-        for text in texts:
-            text.set_fontsize(9)
-        for autotext in autotexts:
-            autotext.set_fontsize(8)
-            autotext.set_color('white')
-            autotext.set_weight('bold')
-        
-        plt.tight_layout(pad=2.0)
-        return fig
+        return reuse_figure(assessment_pie_figure(filter_key()))
     
     @output
     @render.plot(alt="Top 10 Mutated Genes")
     def gene_bar():
-        plt.close('all')
-        fig, ax = plt.subplots(figsize=(7, 5))
-        df = filtered_data()
-        
-        top_genes = df['gene'].value_counts().head(10)
-        ax.barh(top_genes.index[::-1], top_genes.values[::-1], color='#0068B1', alpha=0.7)
-        ax.set_xlabel('Number of Variants', fontsize=11)
-        ax.tick_params(axis='y', labelsize=9)
-        
-        ax.grid(True, alpha=0.3, axis='x')
-        
-        # Use tight_layout with extra padding on the left
-        plt.tight_layout()
-        plt.subplots_adjust(left=0.3)
-        return fig
+        return reuse_figure(gene_bar_figure(filter_key()))
     
     @output
     @render.plot
     def allele_fraction_hist():
-        fig, ax = plt.subplots(figsize=(7, 6))
+        fig, ax = get_fig('allele_fraction_hist', (7, 6))
         df = filtered_data()
         
-        ax.hist(df['allelefraction'], bins=30, color='#00A783', alpha=0.7, edgecolor='black')
+        counts, _ = np.histogram(df['allelefraction'].to_numpy(dtype=np.float32), bins=AF_BINS)
+        ax.bar(AF_BINS[:-1], counts, width=np.diff(AF_BINS), align='edge', color='#00A783', 
+               alpha=0.7, edgecolor='black')
         ax.set_xlabel('Allele Fraction', fontsize=11)
         ax.set_ylabel('Count', fontsize=11)
         
@@ -641,39 +946,13 @@ def server(input: Inputs, output: Outputs, session: Session):
     @render.plot(alt="Mutation Landscape")
     def oncoprint():
         """Create a simplified oncoprint visualization"""
-        plt.close('all')
-        fig, ax = plt.subplots(figsize=(12, 5))
-        df = filtered_data()
-        
-        # Get top genes and sample of patients
-        top_genes = df['gene'].value_counts().head(10).index
-        gene_data = df[df['gene'].isin(top_genes)]
+        fig, ax = get_fig('oncoprint', (12, 5))
+        top_genes, patients, codes = oncoprint_matrix()
         
-        # Create matrix
-        patients = gene_data['mrn'].unique()[:25]  # Show patients
-        
-        # Create color map for assessments
-        color_map = {
-            'Pathogenic': '#e74c3c',
-            'Likely Pathogenic': '#f39c12',
-            'VUS': '#95a5a6',
-            'Likely Benign': '#3498db',
-            'Benign': '#2ecc71'
-        }
-        
-        # Plot
-        y_pos = 0
-        for gene in top_genes:
-            x_pos = 0
-            for patient in patients:
-                patient_gene = gene_data[(gene_data['mrn'] == patient) & (gene_data['gene'] == gene)]
-                if not patient_gene.empty:
-                    assessment = patient_gene.iloc[0]['assessment']
-                    color = color_map.get(assessment, 'gray')
-                    rect = Rectangle((x_pos, y_pos), 1, 1, facecolor=color, edgecolor='black', linewidth=0.5)
-                    ax.add_patch(rect)
-                x_pos += 1
-            y_pos += 1
+        # Draw the whole grid as a single mesh; empty cells stay masked
+        if codes.size:
+            ax.pcolormesh(np.ma.masked_invalid(codes), cmap=ONCOPRINT_CMAP, vmin=-0.5,
+                          vmax=len(ASSESSMENT_COLORS) + 0.5, edgecolors='black', linewidth=0.5)
         
         ax.set_xlim(0, len(patients))
         ax.set_ylim(0, len(top_genes))
@@ -688,7 +967,7 @@ def server(input: Inputs, output: Outputs, session: Session):
         # Add legend
         from matplotlib.patches import Patch
         legend_elements = [Patch(facecolor=color, label=assessment) 
-                          for assessment, color in color_map.items()]
+                          for assessment, color in ASSESSMENT_COLORS.items()]
         
         ax.legend(handles=legend_elements, 
                  loc='center left', 
@@ -698,8 +977,8 @@ def server(input: Inputs, output: Outputs, session: Session):
                  frameon=True)
         
         # Adjust layout
-        plt.tight_layout()
-        plt.subplots_adjust(right=0.82, bottom=0.15)
+        fig.tight_layout()
+        fig.subplots_adjust(right=0.82, bottom=0.15)
         return fig
     
     # ═══════════════════════════════════════════════════════════════
@@ -709,34 +988,31 @@ def server(input: Inputs, output: Outputs, session: Session):
     @output
     @render.ui
     def total_protocols_card():
-        return summary_card("Active Protocols", len(data['protocols']), "🏥")
+        return summary_card("Active Protocols", STATIC['n_protocols'], "🏥")
     
     @output
     @render.ui
     def enrolled_patients_card():
-        df = filtered_data()
-        enrolled = len(df['mrn'].unique())
+        enrolled = len(filtered_patients())
         return summary_card("Enrolled Patients", enrolled, "👥")
     
     @output
     @render.ui
     def total_interventions_card():
-        return summary_card("Intervention Types", len(data['interventions']['intervention_category'].unique()), "💊")
+        return summary_card("Intervention Types", STATIC['n_interventions'], "💊")
     
     @output
     @render.ui
     def serious_ae_card():
-        serious_ae = data['adverse_events'][data['adverse_events']['serious'] == True]
-        return summary_card("Serious AEs", len(serious_ae), "⚠️")
+        return summary_card("Serious AEs", STATIC['n_serious_ae'], "⚠️")
     
     @output
     @render.plot(alt="Protocol Enrollment")
     def protocol_enrollment():
-        plt.close('all')
-        fig, ax = plt.subplots(figsize=(9, 5))
+        fig, ax = get_fig('protocol_enrollment', (9, 5))
         
         # Count enrollments per protocol
-        protocol_counts = data['subjects']['protocol_id'].value_counts()
+        protocol_counts = COUNTS['protocol']
         
         ax.bar(range(len(protocol_counts)), protocol_counts.values, color='#0068B1', alpha=0.7)
         ax.set_xlabel('Protocol', fontsize=12)
@@ -747,25 +1023,19 @@ def server(input: Inputs, output: Outputs, session: Session):
         ax.grid(True, alpha=0.3, axis='y')
         
         # Ensure labels don't get cut off
-        plt.tight_layout()
-        plt.subplots_adjust(bottom=0.2)
+        fig.tight_layout()
+        fig.subplots_adjust(bottom=0.2)
         return fig
     
     @output
     @render.plot
     def intervention_dist():
-        fig, ax = plt.subplots(figsize=(10, 7))
+        fig, ax = get_fig('intervention_dist', (10, 7))
         
-        intervention_counts = data['interventions']['intervention_category'].value_counts()
+        intervention_counts = COUNTS['intervention']
         
         # Shorter labels with better formatting
-        labels = []
-        for i in intervention_counts.index[::-1]:
-            label = i.replace(' Therapy', '')
-            label = label.replace('Angiogenesis Inhibitors', 'Angiogenesis Inh.')
-            label = label.replace('Immunotherapy', 'Immuno')
-            label = label.replace('Chemotherapy', 'Chemo')
-            labels.append(label)
+        labels = COUNT_LABELS['intervention']
         
         ax.barh(range(len(intervention_counts)), intervention_counts.values[::-1], 
                 color='#00A783', alpha=0.7)
@@ -779,19 +1049,18 @@ def server(input: Inputs, output: Outputs, session: Session):
         ax.spines['right'].set_visible(False)
         
         # Increased left margin to prevent label cutoff
-        plt.tight_layout(rect=[0.18, 0, 1, 1])
+        fig.tight_layout(rect=[0.18, 0, 1, 1])
         return fig
     
     @output
     @render.plot
     def ae_grade_dist():
-        fig, ax = plt.subplots(figsize=(9, 6))
+        fig, ax = get_fig('ae_grade_dist', (9, 6))
         
-        grade_counts = data['adverse_events']['grade'].value_counts().sort_index()
+        grade_counts = COUNTS['grade']
         
-        colors = ['#00A783', '#1881C2', '#FF9800', '#E83E48', '#8B0000']
         ax.bar(grade_counts.index, grade_counts.values, 
-               color=[colors[i-1] for i in grade_counts.index], alpha=0.7)
+               color=COUNT_COLORS['grade'], alpha=0.7)
         ax.set_xlabel('Grade', fontsize=12)
         ax.set_ylabel('Number of Events', fontsize=12)
         
@@ -804,37 +1073,19 @@ def server(input: Inputs, output: Outputs, session: Session):
     @output
     @render.plot
     def ae_system_dist():
-        fig, ax = plt.subplots(figsize=(10, 7))
+        fig, ax = get_fig('ae_system_dist', (10, 7))
         
-        system_counts = data['adverse_events']['ae_body_system'].value_counts().head(8)
+        system_counts = COUNTS['ae_system']
         
         # Much shorter labels
-        label_map = {
-            'Respiratory, thoracic and mediastinal disorders': 'Respiratory',
-            'Blood and lymphatic system disorders': 'Blood/Lymph',
-            'Cardiac disorders': 'Cardiac',
-            'Gastrointestinal disorders': 'GI',
-            'General disorders and administration site conditions': 'General',
-            'Hepatobiliary disorders': 'Hepatobiliary',
-            'Immune system disorders': 'Immune',
-            'Infections and infestations': 'Infections',
-            'Metabolism and nutrition disorders': 'Metabolism',
-            'Musculoskeletal and connective tissue disorders': 'Musculoskeletal',
-            'Nervous system disorders': 'Nervous',
-            'Skin and subcutaneous tissue disorders': 'Skin'
-        }
-        
-        labels = [label_map.get(x, x.split()[0][:12]) for x in system_counts.index]
+        labels = COUNT_LABELS['ae_system']
         
         # Use gradient colors
-        colors = ['#E57373', '#EF5350', '#F44336', '#E53935', '#D32F2F', '#C62828', '#B71C1C', '#D50000']
-        
         bars = ax.barh(range(len(system_counts)), system_counts.values, 
-                       color=colors[:len(system_counts)], edgecolor='white', linewidth=1.5)
+                       color=COUNT_COLORS['ae_system'], edgecolor='white', linewidth=1.5)
         
         # Add values
-        for i, v in enumerate(system_counts.values):
-            ax.text(v + 1, i, str(v), va='center', fontweight='500')
+        ax.bar_label(bars, labels=[str(v) for v in system_counts.values], padding=3, fontweight='500')
         
         ax.set_yticks(range(len(system_counts)))
         ax.set_yticklabels(labels, fontsize=10, fontweight='500')
@@ -845,20 +1096,18 @@ def server(input: Inputs, output: Outputs, session: Session):
         ax.invert_yaxis()
         
         # Adjust margins - increased left margin
-        plt.subplots_adjust(left=0.3)
-        plt.tight_layout()
+        fig.subplots_adjust(left=0.3)
+        fig.tight_layout()
         return fig
     
     @output
     @render.plot
     def survival_curve():
         """Generate Kaplan-Meier survival curves"""
-        fig, ax = plt.subplots(figsize=(10, 7))
+        fig, ax = get_fig('survival_curve', (10, 7))
         
-        from lifelines import KaplanMeierFitter
-        
-        # Set seed for reproducibility
-        np.random.seed(42)
+        # (label, n, scale, event rate) per curve; the fits are cached on the whole tuple
+        strata = []
         
         stratify_by = input.survival_stratify()
         
@@ -866,69 +1115,50 @@ def server(input: Inputs, output: Outputs, session: Session):
         df = filtered_data()
         
         if stratify_by == "intervention":
-            # Load intervention data from CSV
+            # Use the intervention tables loaded at startup
             try:
-                subjects_df = pd.read_csv('clinical_trial_subjects.csv')
-                interventions_df = pd.read_csv('interventions.csv')
+                interventions_df = data['interventions']
                 
                 # Get unique interventions
                 intervention_types = interventions_df['intervention_category'].unique()[:4]
                 
+                # Patients in our current dataset per intervention, from the pre-joined pairs
+                pairs = TRIAL_MRNS['intervention']
+                patient_counts = observed_counts(pairs.loc[np.isin(pairs['mrn'].to_numpy(), filtered_mrns()), 'intervention_category'])
+                
                 for intervention in intervention_types:
-                    # Get patients with this intervention
-                    intervention_raves = interventions_df[
-                        interventions_df['intervention_category'] == intervention
-                    ]['rave_id'].unique()
-                    
-                    intervention_mrns = subjects_df[
-                        subjects_df['rave_id'].isin(intervention_raves)
-                    ]['mrn'].unique()
-                    
-                    # Filter to patients in our current dataset
-                    intervention_patients = df[df['mrn'].isin(intervention_mrns)]['mrn'].unique()
-                    n_patients = len(intervention_patients)
+                    n_patients = patient_counts.get(intervention, 0)
                     
                     if n_patients > 0:
-                        # Generate synthetic survival data based on intervention type
+                        # Synthetic survival parameters based on intervention type
                         if intervention == "Immunotherapy":
-                            times = np.random.exponential(scale=500, size=n_patients)
-                            events = np.random.binomial(1, 0.6, size=n_patients)
+                            scale, event_rate = 500, 0.6
                         elif intervention == "Chemotherapy":
-                            times = np.random.exponential(scale=400, size=n_patients)
-                            events = np.random.binomial(1, 0.7, size=n_patients)
+                            scale, event_rate = 400, 0.7
                         elif intervention == "Targeted Therapy":
-                            times = np.random.exponential(scale=450, size=n_patients)
-                            events = np.random.binomial(1, 0.65, size=n_patients)
+                            scale, event_rate = 450, 0.65
                         else:
-                            times = np.random.exponential(scale=350, size=n_patients)
-                            events = np.random.binomial(1, 0.75, size=n_patients)
+                            scale, event_rate = 350, 0.75
                         
-                        # Fit and plot
-                        kmf = KaplanMeierFitter()
-                        kmf.fit(times, events, label=f"{intervention} (n={n_patients})")
-                        kmf.plot_survival_function(ax=ax)
+                        strata.append((f"{intervention} (n={n_patients})", int(n_patients), scale, event_rate))
                         
             except Exception as e:
                 print(f"Error loading intervention data: {e}")
         
         elif stratify_by == "protocol":
-            # Load protocol data from CSV
+            # Use the protocol tables loaded at startup
             try:
-                subjects_df = pd.read_csv('clinical_trial_subjects.csv')
-                protocols_df = pd.read_csv('protocols.csv')
+                protocols_df = data['protocols']
                 
-                # Get protocol enrollment counts
-                protocol_counts = subjects_df['protocol_id'].value_counts().head(4)
+                # Get protocol enrollment counts, already counted at startup
+                protocol_counts = COUNTS['protocol'].head(4)
+                
+                # Patients in our current dataset per protocol, from the distinct pairs
+                pairs = TRIAL_MRNS['protocol']
+                patient_counts = observed_counts(pairs.loc[np.isin(pairs['mrn'].to_numpy(), filtered_mrns()), 'protocol_id'])
                 
                 for protocol_id in protocol_counts.index:
-                    # Get patients in this protocol
-                    protocol_mrns = subjects_df[
-                        subjects_df['protocol_id'] == protocol_id
-                    ]['mrn'].unique()
-                    
-                    # Filter to patients in our current dataset
-                    protocol_patients = df[df['mrn'].isin(protocol_mrns)]['mrn'].unique()
-                    n_patients = len(protocol_patients)
+                    n_patients = patient_counts.get(protocol_id, 0)
                     
                     if n_patients > 0:
                         # Get phase information
@@ -936,72 +1166,58 @@ def server(input: Inputs, output: Outputs, session: Session):
                             protocols_df['protocol_id'] == protocol_id
                         ]['phase'].iloc[0] if len(protocols_df[protocols_df['protocol_id'] == protocol_id]) > 0 else "Unknown"
                         
-                        # Generate synthetic survival data based on phase
+                        # Synthetic survival parameters based on phase
                         if phase == "Phase III":
-                            times = np.random.exponential(scale=500, size=n_patients)
-                            events = np.random.binomial(1, 0.6, size=n_patients)
+                            scale, event_rate = 500, 0.6
                         elif phase == "Phase II":
-                            times = np.random.exponential(scale=400, size=n_patients)
-                            events = np.random.binomial(1, 0.7, size=n_patients)
+                            scale, event_rate = 400, 0.7
                         else:  # Phase I
-                            times = np.random.exponential(scale=300, size=n_patients)
-                            events = np.random.binomial(1, 0.8, size=n_patients)
+                            scale, event_rate = 300, 0.8
                         
-                        # Fit and plot
-                        kmf = KaplanMeierFitter()
-                        kmf.fit(times, events, label=f"{protocol_id} - {phase} (n={n_patients})")
-                        kmf.plot_survival_function(ax=ax)
+                        strata.append((f"{protocol_id} - {phase} (n={n_patients})", int(n_patients), scale, event_rate))
                         
             except Exception as e:
                 print(f"Error loading protocol data: {e}")
         
         elif stratify_by == "gene":
-            # Get top mutated genes from filtered data
-            top_genes = df['gene'].value_counts().head(4).index
+            # Get top mutated genes from the shared filtered counts
+            top_genes = gene_counts().head(4).index
+            
+            # Patients with each gene mutation in one grouped pass
+            patient_counts = df.groupby('gene', observed=True)['mrn'].nunique()
             
             for gene in top_genes:
-                # Get patients with this gene mutation
-                gene_patients = df[df['gene'] == gene]['mrn'].unique()
-                n_patients = len(gene_patients)
+                n_patients = patient_counts.get(gene, 0)
                 
                 if n_patients > 0:
-                    # Generate synthetic survival data based on gene
+                    # Synthetic survival parameters based on gene
                     if gene in ['TP53', 'KRAS']:
-                        times = np.random.exponential(scale=350, size=n_patients)
-                        events = np.random.binomial(1, 0.75, size=n_patients)
+                        scale, event_rate = 350, 0.75
                     elif gene in ['BRCA1', 'BRCA2']:
-                        times = np.random.exponential(scale=500, size=n_patients)
-                        events = np.random.binomial(1, 0.6, size=n_patients)
+                        scale, event_rate = 500, 0.6
                     else:
-                        times = np.random.exponential(scale=450, size=n_patients)
-                        events = np.random.binomial(1, 0.65, size=n_patients)
+                        scale, event_rate = 450, 0.65
                     
-                    # Fit and plot
-                    kmf = KaplanMeierFitter()
-                    kmf.fit(times, events, label=f"{gene} mutation (n={n_patients})")
-                    kmf.plot_survival_function(ax=ax)
+                    strata.append((f"{gene} mutation (n={n_patients})", int(n_patients), scale, event_rate))
         
         elif stratify_by == "sex":
             # Stratify by sex - this should work since it's in the filtered data
-            unique_patients = df.drop_duplicates('mrn')
+            patient_counts = filtered_patients()['sex'].value_counts()
             
             for sex in ['male', 'female']:
-                sex_patients = unique_patients[unique_patients['sex'] == sex]['mrn'].values
-                n_patients = len(sex_patients)
+                n_patients = patient_counts.get(sex, 0)
                 
                 if n_patients > 0:
-                    # Generate synthetic survival data
+                    # Synthetic survival parameters
                     if sex == 'female':
-                        times = np.random.exponential(scale=480, size=n_patients)
-                        events = np.random.binomial(1, 0.65, size=n_patients)
+                        scale, event_rate = 480, 0.65
                     else:
-                        times = np.random.exponential(scale=420, size=n_patients)
-                        events = np.random.binomial(1, 0.7, size=n_patients)
+                        scale, event_rate = 420, 0.7
                     
-                    # Fit and plot
-                    kmf = KaplanMeierFitter()
-                    kmf.fit(times, events, label=f"{sex.capitalize()} (n={n_patients})")
-                    kmf.plot_survival_function(ax=ax)
+                    strata.append((f"{sex.capitalize()} (n={n_patients})", int(n_patients), scale, event_rate))
+        
+        for kmf in fit_survival_curves(tuple(strata)):
+            kmf.plot_survival_function(ax=ax)
         
         # Customize plot
         ax.set_xlabel('Time (days)', fontsize=12)
@@ -1021,19 +1237,17 @@ def server(input: Inputs, output: Outputs, session: Session):
     @render.ui
     def outcomes_summary():
         """Generate outcomes summary statistics"""
-        df = filtered_data()
-        unique_patients = df.drop_duplicates('mrn')
-        
-        # Get clinical trial data
-        enrolled_patients = data['subjects']['mrn'].nunique()
-        completed_trials = len(data['subjects'][data['subjects']['enrollment_status'] == 'Completed'])
+        # Get clinical trial data, counted once at startup
+        enrolled_patients = STATIC['n_enrolled']
+        status_counts = COUNTS['enrollment_status']
+        completed_trials = status_counts.get('Completed', 0)
         
         return ui.div(
             ui.h5("Clinical Trial Outcomes", style="margin-bottom: 15px;"),
             ui.p(f"Total Enrolled Patients: {enrolled_patients}", style="font-size: 16px;"),
             ui.p(f"Completed Enrollments: {completed_trials}", style="font-size: 16px;"),
-            ui.p(f"Active Enrollments: {len(data['subjects'][data['subjects']['enrollment_status'] == 'Active'])}", style="font-size: 16px;"),
-            ui.p(f"Withdrawal Rate: {len(data['subjects'][data['subjects']['enrollment_status'] == 'Withdrawn']) / len(data['subjects']) * 100:.1f}%", style="font-size: 16px;"),
+            ui.p(f"Active Enrollments: {status_counts.get('Active', 0)}", style="font-size: 16px;"),
+            ui.p(f"Withdrawal Rate: {status_counts.get('Withdrawn', 0) / len(data['subjects']) * 100:.1f}%", style="font-size: 16px;"),
             style="background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);"
         )
 
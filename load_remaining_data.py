@@ -6,92 +6,153 @@ Run this after your existing load_to_memgraph.py
 
 import pandas as pd
 from neo4j import GraphDatabase
+from neo4j.exceptions import Neo4jError
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 
 # Connect to Memgraph
 driver = GraphDatabase.driver("bolt://localhost:7687", auth=("", ""))
 
+# Rows sent per UNWIND query; one write transaction per batch bounds transaction memory
+BATCH_SIZE = 5000
+
+def run_batched(session, query, rows):
+    """Run an `UNWIND $rows AS r ...` write query over rows, one transaction per batch"""
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        session.execute_write(lambda tx: tx.run(query, rows=batch).consume())
+
+# Writer sessions for the relationship loads; the driver is thread-safe, sessions are not
+WRITERS = min(4, os.cpu_count() or 1)
+
+def run_parallel_batched(query, rows):
+    """Like run_batched, but commits the batches from WRITERS sessions at once"""
+    def write_batch(batch):
+        with driver.session() as session:
+            # execute_write retries the transient conflicts concurrent MERGEs can raise
+            session.execute_write(lambda tx: tx.run(query, rows=batch).consume())
+    
+    batches = [rows[start:start + BATCH_SIZE] for start in range(0, len(rows), BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=WRITERS) as pool:
+        list(pool.map(write_batch, batches))
+
+def read_table(path):
+    """Read a CSV through the Parquet copy next to it, (re)writing the copy when missing or stale"""
+    parquet_path = path + '.parquet'
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(path):
+        return pd.read_parquet(parquet_path)
+    df = pd.read_csv(path)
+    df.to_parquet(parquet_path, index=False)
+    return df
+
+# Input tables, read in parallel before any writes start
+TABLES = {
+    'protocols': 'protocols.csv',
+    'subjects': 'clinical_trial_subjects.csv',
+    'interventions': 'interventions.csv',
+    'adverse_events': 'adverse_events.csv',
+}
+
+def read_tables():
+    """Read every input table on its own thread, reporting each one as it finishes"""
+    tables = {}
+    with ThreadPoolExecutor(max_workers=len(TABLES)) as pool:
+        futures = {pool.submit(read_table, path): name for name, path in TABLES.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            tables[name] = future.result()
+            print(f"📄 Read {TABLES[name]} ({len(tables[name])} rows)")
+    return tables
+
+# Properties the loaders MERGE or MATCH on; without an index each lookup scans the whole label
+INDEXES = [
+    ("Patient", "mrn"),
+    ("Protocol", "protocol_id"),
+    ("ClinicalTrialSubject", "rave_id"),
+    ("Intervention", "intervention_category"),
+    ("AdverseEvent", "ae_body_system"),
+]
+
+def ensure_indexes(session):
+    """Create the label/property indexes the loaders look nodes up by, skipping ones that exist"""
+    for label, prop in INDEXES:
+        try:
+            session.run(f"CREATE INDEX ON :{label}({prop})").consume()
+        except Neo4jError as e:
+            print(f"  Index on :{label}({prop}) not created: {e}")
+
 def load_remaining_data():
     """Load protocols, clinical trial subjects, interventions, and adverse events"""
     
+    # File reads overlap each other; the writes below stay in dependency order
+    tables = read_tables()
+    
     with driver.session() as session:
+        ensure_indexes(session)
         
         # ═══════════════════════════════════════════════════════════════
         # 1. Load Protocols
         # ═══════════════════════════════════════════════════════════════
         print("\n🏥 Loading Protocols...")
-        protocols_df = pd.read_csv('protocols.csv')
-        
-        for _, row in protocols_df.iterrows():
-            session.run("""
-                MERGE (pr:Protocol {protocol_id: $protocol_id})
-                SET pr.protocol_name = $protocol_name,
-                    pr.phase = $phase,
-                    pr.status = $status,
-                    pr.target_enrollment = $target_enrollment
-            """,
-            protocol_id=row['protocol_id'],
-            protocol_name=row['protocol_name'],
-            phase=row['phase'],
-            status=row['status'],
-            target_enrollment=int(row['target_enrollment']))
-            
+        protocols_df = tables['protocols']
+        
+        run_batched(session, """
+            UNWIND $rows AS r
+            MERGE (pr:Protocol {protocol_id: r.protocol_id})
+            SET pr.protocol_name = r.protocol_name,
+                pr.phase = r.phase,
+                pr.status = r.status,
+                pr.target_enrollment = r.target_enrollment
+        """, protocols_df.astype({'target_enrollment': int}).to_dict('records'))
+        
         print(f"✅ Loaded {len(protocols_df)} protocols")
         
         # ═══════════════════════════════════════════════════════════════
         # 2. Load Clinical Trial Subjects
         # ═══════════════════════════════════════════════════════════════
         print("\n👥 Loading Clinical Trial Subjects...")
-        subjects_df = pd.read_csv('clinical_trial_subjects.csv')
-        
-        for _, row in subjects_df.iterrows():
-            session.run("""
-                MATCH (p:Patient {mrn: $mrn})
-                MATCH (pr:Protocol {protocol_id: $protocol_id})
-                MERGE (cts:ClinicalTrialSubject {rave_id: $rave_id})
-                SET cts.enrollment_date = $enrollment_date,
-                    cts.enrollment_status = $enrollment_status,
-                    cts.mrn = $mrn,
-                    cts.protocol_id = $protocol_id
-                MERGE (p)-[:ENROLLED_AS]->(cts)
-                MERGE (cts)-[:IN_PROTOCOL]->(pr)
-            """,
-            mrn=int(row['mrn']),
-            protocol_id=row['protocol_id'],
-            rave_id=row['rave_id'],
-            enrollment_date=str(row['enrollment_date']),
-            enrollment_status=row['enrollment_status'])
-            
+        subjects_df = tables['subjects']
+        
+        run_batched(session, """
+            UNWIND $rows AS r
+            MATCH (p:Patient {mrn: r.mrn})
+            MATCH (pr:Protocol {protocol_id: r.protocol_id})
+            MERGE (cts:ClinicalTrialSubject {rave_id: r.rave_id})
+            SET cts.enrollment_date = r.enrollment_date,
+                cts.enrollment_status = r.enrollment_status,
+                cts.mrn = r.mrn,
+                cts.protocol_id = r.protocol_id
+            MERGE (p)-[:ENROLLED_AS]->(cts)
+            MERGE (cts)-[:IN_PROTOCOL]->(pr)
+        """, subjects_df.astype({'mrn': int, 'enrollment_date': str}).to_dict('records'))
+        
         print(f"✅ Loaded {len(subjects_df)} clinical trial subjects")
         
         # ═══════════════════════════════════════════════════════════════
         # 3. Load Interventions
         # ═══════════════════════════════════════════════════════════════
         print("\n💊 Loading Interventions...")
-        interventions_df = pd.read_csv('interventions.csv')
+        interventions_df = tables['interventions']
         
-        # Create unique intervention nodes
-        for intervention_cat in interventions_df['intervention_category'].unique():
-            session.run("""
-                MERGE (i:Intervention {intervention_category: $intervention_category})
-            """, intervention_category=intervention_cat)
+        # Create unique intervention nodes in one UNWIND
+        run_batched(session, """
+            UNWIND $rows AS c
+            MERGE (i:Intervention {intervention_category: c})
+        """, interventions_df['intervention_category'].unique().tolist())
         
         # Create relationships
-        for _, row in interventions_df.iterrows():
-            session.run("""
-                MATCH (cts:ClinicalTrialSubject {rave_id: $rave_id})
-                MATCH (i:Intervention {intervention_category: $intervention_category})
-                MERGE (cts)-[r:RECEIVED_INTERVENTION]->(i)
-                SET r.dose_level = $dose_level,
-                    r.start_date = $start_date,
-                    r.duration_days = $duration_days
-            """,
-            rave_id=row['rave_id'],
-            intervention_category=row['intervention_category'],
-            dose_level=row['dose_level'],
-            start_date=str(row['start_date']),
-            duration_days=int(row['duration_days']))
-            
+        # Rows sorted by category so concurrent batches rarely touch the same Intervention node
+        run_parallel_batched("""
+            UNWIND $rows AS r
+            MATCH (cts:ClinicalTrialSubject {rave_id: r.rave_id})
+            MATCH (i:Intervention {intervention_category: r.intervention_category})
+            MERGE (cts)-[rel:RECEIVED_INTERVENTION]->(i)
+            SET rel.dose_level = r.dose_level,
+                rel.start_date = r.start_date,
+                rel.duration_days = r.duration_days
+        """, interventions_df.astype({'start_date': str, 'duration_days': int})
+            .sort_values('intervention_category', kind='stable').to_dict('records'))
+        
         print(f"✅ Loaded {len(interventions_df.intervention_category.unique())} intervention types")
         print(f"✅ Created {len(interventions_df)} intervention relationships")
         
@@ -99,30 +160,27 @@ def load_remaining_data():
         # 4. Load Adverse Events
         # ═══════════════════════════════════════════════════════════════
         print("\n⚠️  Loading Adverse Events...")
-        ae_df = pd.read_csv('adverse_events.csv')
+        ae_df = tables['adverse_events']
         
-        # Create unique AE nodes
-        for ae_system in ae_df['ae_body_system'].unique():
-            session.run("""
-                MERGE (ae:AdverseEvent {ae_body_system: $ae_body_system})
-            """, ae_body_system=ae_system)
+        # Create unique AE nodes in one UNWIND
+        run_batched(session, """
+            UNWIND $rows AS c
+            MERGE (ae:AdverseEvent {ae_body_system: c})
+        """, ae_df['ae_body_system'].unique().tolist())
         
         # Create relationships
-        for _, row in ae_df.iterrows():
-            session.run("""
-                MATCH (cts:ClinicalTrialSubject {rave_id: $rave_id})
-                MATCH (ae:AdverseEvent {ae_body_system: $ae_body_system})
-                MERGE (cts)-[r:EXPERIENCED_AE]->(ae)
-                SET r.grade = $grade,
-                    r.serious = $serious,
-                    r.onset_date = $onset_date
-            """,
-            rave_id=row['rave_id'],
-            ae_body_system=row['ae_body_system'],
-            grade=int(row['grade']),
-            serious=bool(row['serious']),
-            onset_date=str(row['onset_date']))
-            
+        # Same category grouping for the AdverseEvent nodes
+        run_parallel_batched("""
+            UNWIND $rows AS r
+            MATCH (cts:ClinicalTrialSubject {rave_id: r.rave_id})
+            MATCH (ae:AdverseEvent {ae_body_system: r.ae_body_system})
+            MERGE (cts)-[rel:EXPERIENCED_AE]->(ae)
+            SET rel.grade = r.grade,
+                rel.serious = r.serious,
+                rel.onset_date = r.onset_date
+        """, ae_df.astype({'grade': int, 'serious': bool, 'onset_date': str})
+            .sort_values('ae_body_system', kind='stable').to_dict('records'))
+        
         print(f"✅ Loaded {len(ae_df.ae_body_system.unique())} adverse event types")
         print(f"✅ Created {len(ae_df)} adverse event relationships")
         
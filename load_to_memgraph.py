@@ -8,8 +8,63 @@ Usage:
   python load_to_memgraph.py
 """
 
+import os
+
 import pandas as pd
+import pyarrow.parquet as pq
 from neo4j import GraphDatabase
+from neo4j.exceptions import Neo4jError
+
+
+# Properties the MERGE/MATCH queries look nodes up by
+INDEXES = [("Patient", "mrn"), ("Variant", "id")]
+
+# Rows per UNWIND query, each committed as one write transaction
+BATCH_SIZE = 5000
+
+PATIENT_QUERY = "UNWIND $rows AS r MERGE (p:Patient {mrn: r.mrn}) ON CREATE SET p.age = r.age, p.sex = r.sex"
+
+VARIANT_QUERY = (
+    "UNWIND $rows AS r "
+    "MERGE (v:Variant {id: r.vid}) ON CREATE SET v.gene = r.gene, v.assessment = r.assessment, v.allele_fraction = r.af "
+    "WITH v, r MATCH (p:Patient {mrn: r.mrn}) MERGE (p)-[:HAS_VARIANT]->(v)"
+)
+
+
+def read_table(path, columns=None):
+    """
+    Read a CSV through the Parquet copy next to it, (re)writing the copy when it is missing or stale.
+    If columns is given, only those of them present in the file are returned; a fresh copy reads just those.
+    """
+    parquet_path = path + ".parquet"
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(path):
+        if columns is not None:
+            columns = [col for col in columns if col in pq.read_schema(parquet_path).names]
+        return pd.read_parquet(parquet_path, columns=columns)
+
+    # The copy is shared with the other scripts, so it always holds every column
+    df = pd.read_csv(path)
+    df.to_parquet(parquet_path, index=False)
+    return df if columns is None else df[[col for col in columns if col in df.columns]]
+
+
+def ensure_indexes(session):
+    """
+    Create the label/property indexes used by the loading queries, skipping ones that already exist.
+    """
+    for label, prop in INDEXES:
+        try:
+            session.run(f"CREATE INDEX ON :{label}({prop})").consume()
+        except Neo4jError as e:
+            print(f"Index on :{label}({prop}) not created: {e}")
+
+
+def run_batched(session, query, rows):
+    """
+    Run an UNWIND $rows query over rows in BATCH_SIZE chunks, one explicit write transaction per chunk.
+    """
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.execute_write(lambda tx, chunk=rows[start:start + BATCH_SIZE]: tx.run(query, rows=chunk).consume())
 
 
 def load_variants_and_link(driver, demo_df):
@@ -17,7 +72,9 @@ def load_variants_and_link(driver, demo_df):
     Read remapped variants, drop synthetic MRN, create nodes and relationships in Memgraph.
     """
     # 1) Read remapped variant data (contains both 'MRN' and demographic 'mrn')
-    variants_df = pd.read_csv("variants_with_50_demo_mrn.csv")
+    variants_df = read_table(
+        "variants_with_50_demo_mrn.csv", columns=["MRN", "variant_id", "mrn", "gene", "assessment", "allelefraction"]
+    )
 
     # 2) Drop the synthetic MRN column; keep only demographic 'mrn'
     variants_df.drop(columns=["MRN"], inplace=True, errors="ignore")
@@ -28,32 +85,34 @@ def load_variants_and_link(driver, demo_df):
 
     # 4) Create a unique variant_id if missing
     if "variant_id" not in variants_df.columns:
-        variants_df["variant_id"] = variants_df.apply(
-            lambda row: f"{row['mrn']}_{row['gene']}_{row.name}", axis=1
+        variants_df["variant_id"] = (
+            variants_df["mrn"].astype(str) + "_" + variants_df["gene"].astype(str) + "_" + variants_df.index.astype(str)
         )
 
-    # 5) Prepare Cypher queries in batches
-    patient_queries = [
-        ("MERGE (p:Patient {mrn: $mrn}) ON CREATE SET p.age = $age, p.sex = $sex",
-         {"mrn": row["mrn"], "age": int(row["age"]), "sex": row["sex"]})
-        for _, row in demo_df.iterrows()
-    ]
-
-    variant_queries = [
-        ("MERGE (v:Variant {id: $vid}) ON CREATE SET v.gene = $gene, v.assessment = $assessment, v.allele_fraction = $af WITH v MATCH (p:Patient {mrn: $mrn}) MERGE (p)-[:HAS_VARIANT]->(v)",
-         {"vid": row["variant_id"], "gene": row.get("gene"), "assessment": row.get("assessment"), "af": float(row.get("allelefraction", 0)), "mrn": row["mrn"]})
-        for _, row in variants_df.iterrows()
-    ]
+    # 5) Cast whole columns once, then build the UNWIND parameter rows
+    patient_rows = demo_df.astype({"age": "int64"})[["mrn", "age", "sex"]].to_dict("records")
+
+    # Allele fraction defaults to 0.0 when the column is absent or a value doesn't parse
+    if "allelefraction" not in variants_df.columns:
+        variants_df["allelefraction"] = 0.0
+    variants_df["allelefraction"] = pd.to_numeric(variants_df["allelefraction"], errors="coerce").fillna(0.0)
+    variant_rows = (
+        variants_df.reindex(columns=["variant_id", "gene", "assessment", "allelefraction", "mrn"])
+        .rename(columns={"variant_id": "vid", "allelefraction": "af"})
+        .astype(object)
+        .where(lambda df: df.notna(), None)  # Other missing columns or values go to Memgraph as null
+        .to_dict("records")
+    )
 
     # Execute in batches
     with driver.session() as session:
-        print(f"Executing {len(patient_queries)} patient MERGE queries...")
-        for query, params in patient_queries:
-            session.run(query, params)
+        ensure_indexes(session)
+
+        print(f"Executing {len(patient_rows)} patient MERGEs in batches of {BATCH_SIZE}...")
+        run_batched(session, PATIENT_QUERY, patient_rows)
 
-        print(f"Executing {len(variant_queries)} variant MERGE queries...")
-        for query, params in variant_queries:
-            session.run(query, params)
+        print(f"Executing {len(variant_rows)} variant MERGEs in batches of {BATCH_SIZE}...")
+        run_batched(session, VARIANT_QUERY, variant_rows)
 
         # Verification summary
         result = session.run(
@@ -73,7 +132,7 @@ def main():
     print(f"Connected to Memgraph at {uri}")
 
     # 3) Load cleaned demographics
-    demo_df = pd.read_csv("clean_demographics.csv")
+    demo_df = read_table("clean_demographics.csv")
     print(f"Loaded {len(demo_df)} demographic rows")
 
     # 4) Load variants and create graph relationships
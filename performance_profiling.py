@@ -5,13 +5,21 @@ Tests query performance as data scales from 1 to 20,000 patients
 As requested by mentors in the meeting
 """
 
+import os
 import pandas as pd
 import numpy as np
+import matplotlib
+
+# Render off-screen when there is no display to show plots on
+if os.environ.get('DISPLAY') is None:
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 import seaborn as sns
 from neo4j import GraphDatabase
+from neo4j.exceptions import Neo4jError
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import time
-import os
 import sys
 from datetime import datetime
 import json
@@ -32,9 +40,93 @@ RUNS_PER_QUERY = 10
 
 # Memgraph connection
 NEO4J_URI = "bolt://localhost:7687"
+# Comma-separated Bolt URIs of Memgraph instances to spread TEST_SIZES over, e.g. one
+# `docker run -p 76xx:7687 memgraph/memgraph` per port; defaults to the single instance above
+NEO4J_URIS = os.getenv("MEMGRAPH_URIS", NEO4J_URI).split(",")
 NEO4J_USER = ""
 NEO4J_PASSWORD = ""
 
+# Rows sent per UNWIND query when loading test data, and rows committed per transaction
+BATCH_SIZE = 1000
+TX_ROWS = 10000
+
+# Where the Memgraph server sees this directory (e.g. a `-v $PWD:/import` bind mount). When
+# set, the server reads the test CSVs itself with LOAD CSV instead of the Python loaders
+IMPORT_DIR = os.getenv("MEMGRAPH_IMPORT_DIR")
+
+# LOAD CSV clause per file, in the same dependency order as the Python loaders
+LOAD_CSV_QUERIES = [
+    ("clean_demographics", """
+        CREATE (p:Patient {mrn: toInteger(row.mrn), age: toInteger(row.age), sex: row.sex})
+    """),
+    ("protocols", """
+        CREATE (pr:Protocol {
+            protocol_id: row.protocol_id,
+            protocol_name: row.protocol_name,
+            phase: row.phase,
+            status: row.status
+        })
+    """),
+    ("interventions", """
+        MERGE (i:Intervention {intervention_category: row.intervention_category})
+    """),
+    ("adverse_events", """
+        MERGE (ae:AdverseEvent {ae_body_system: row.ae_body_system})
+    """),
+    ("variants_with_50_demo_mrn", """
+        MATCH (p:Patient {mrn: toInteger(row.mrn)})
+        CREATE (v:Variant {
+            variant_id: row.variant_id,
+            gene: row.gene,
+            assessment: row.assessment,
+            actionability: row.actionability,
+            allelefraction: toFloat(row.allelefraction)
+        })
+        CREATE (p)-[:HAS_VARIANT]->(v)
+    """),
+    ("clinical_trial_subjects", """
+        MATCH (p:Patient {mrn: toInteger(row.mrn)})
+        MATCH (pr:Protocol {protocol_id: row.protocol_id})
+        CREATE (cts:ClinicalTrialSubject {
+            rave_id: row.rave_id,
+            enrollment_date: row.enrollment_date,
+            enrollment_status: row.enrollment_status
+        })
+        CREATE (p)-[:ENROLLED_AS]->(cts)
+        CREATE (cts)-[:IN_PROTOCOL]->(pr)
+    """),
+    ("interventions", """
+        MATCH (cts:ClinicalTrialSubject {rave_id: row.rave_id})
+        MATCH (i:Intervention {intervention_category: row.intervention_category})
+        CREATE (cts)-[rel:RECEIVED_INTERVENTION {
+            dose_level: row.dose_level,
+            start_date: row.start_date,
+            duration_days: toInteger(row.duration_days)
+        }]->(i)
+    """),
+    ("adverse_events", """
+        MATCH (cts:ClinicalTrialSubject {rave_id: row.rave_id})
+        MATCH (ae:AdverseEvent {ae_body_system: row.ae_body_system})
+        CREATE (cts)-[rel:EXPERIENCED_AE {
+            grade: toInteger(row.grade),
+            serious: toBoolean(row.serious),
+            onset_date: row.onset_date
+        }]->(ae)
+    """),
+]
+
+# Parquet shards the variants file is split into by mrn, each loaded on its own session
+VARIANT_SHARDS = min(8, os.cpu_count() or 1)
+
+# Label/property pairs the loaders MATCH on
+INDEXES = [
+    ("Patient", "mrn"),
+    ("Protocol", "protocol_id"),
+    ("ClinicalTrialSubject", "rave_id"),
+    ("Intervention", "intervention_category"),
+    ("AdverseEvent", "ae_body_system"),
+]
+
 # Output directory for results
 OUTPUT_DIR = "performance_results"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -95,11 +187,82 @@ QUERIES = {
 # HELPER FUNCTIONS
 # ═══════════════════════════════════════════════════════════════
 
-def clear_database(driver):
+def clear_database(session):
     """Clear all data from Memgraph"""
+    session.run("MATCH (n) DETACH DELETE n").consume()
+    print("✅ Cleared database")
+
+def dataset_version(n_patients):
+    """Newest modification time among a size's test data files, or None if they are missing"""
+    data_dir = f"test_data_{n_patients}pts"
+    if not os.path.exists(data_dir):
+        return None
+    return max((os.path.getmtime(os.path.join(data_dir, name))
+                for name in os.listdir(data_dir) if name.endswith('.csv')), default=None)
+
+def is_loaded(session, n_patients):
+    """Whether the database still holds this size's data, loaded from the current files"""
+    record = session.run("""
+        MATCH (m:ProfilingDataset) RETURN m.n_patients AS n_patients, m.version AS version
+    """).single()
+    return (record is not None and record['n_patients'] == n_patients
+            and record['version'] == dataset_version(n_patients))
+
+def mark_loaded(session, n_patients):
+    """Record which size (and file version) the database now holds, so a re-run can skip reloading it"""
+    session.run("CREATE (:ProfilingDataset {n_patients: $n_patients, version: $version})",
+                n_patients=n_patients, version=dataset_version(n_patients)).consume()
+
+def ensure_indexes(session):
+    """Create the label/property indexes the loaders look nodes up by, skipping ones that exist"""
+    for label, prop in INDEXES:
+        try:
+            session.run(f"CREATE INDEX ON :{label}({prop})").consume()
+        except Neo4jError as e:
+            print(f"  Index on :{label}({prop}) not created: {e}")
+
+def run_batched(session, query, rows):
+    """Run an `UNWIND $rows AS r ...` query over rows in BATCH_SIZE chunks, committing every TX_ROWS rows"""
+    for tx_start in range(0, len(rows), TX_ROWS):
+        tx_rows = rows[tx_start:tx_start + TX_ROWS]
+        with session.begin_transaction() as tx:
+            for start in range(0, len(tx_rows), BATCH_SIZE):
+                tx.run(query, rows=tx_rows[start:start + BATCH_SIZE]).consume()
+            tx.commit()
+
+def run_loader(driver, load_func, filepath):
+    """Run one loader on its own session; the driver is thread-safe, sessions are not"""
     with driver.session() as session:
-        session.run("MATCH (n) DETACH DELETE n")
-        print("✅ Cleared database")
+        load_func(session, filepath)
+
+def load_csv_server_side(driver, data_dir, n_patients):
+    """Have Memgraph read each of the size's CSVs itself, one LOAD CSV query per file"""
+    with driver.session() as session:
+        for base_name, clause in LOAD_CSV_QUERIES:
+            filepath = os.path.join(data_dir, f"{base_name}_{n_patients}pts.csv")
+            if not os.path.exists(filepath):
+                print(f"⚠️  Missing file: {filepath}")
+                continue
+            session.run(f"""
+                LOAD CSV FROM "{IMPORT_DIR}/{data_dir}/{base_name}_{n_patients}pts.csv"
+                WITH HEADER NULLIF "" AS row
+                {clause}
+            """).consume()
+            print(f"   ✅ Loaded {base_name} server-side")
+
+def variant_shards(filepath):
+    """Split a variants CSV into VARIANT_SHARDS Parquet files by mrn, rewriting them when stale"""
+    shard_dir = os.path.join(os.path.dirname(filepath), "variant_shards")
+    paths = [os.path.join(shard_dir, f"variants_shard_{i}.parquet") for i in range(VARIANT_SHARDS)]
+    if all(os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(filepath) for path in paths):
+        return paths
+    
+    os.makedirs(shard_dir, exist_ok=True)
+    df = pd.read_csv(filepath, engine='pyarrow', dtype={'mrn': 'int64', 'allelefraction': 'float64'})
+    shard = df['mrn'] % VARIANT_SHARDS
+    for i, path in enumerate(paths):
+        df[shard == i].to_parquet(path, index=False)
+    return paths
 
 def load_data_for_size(driver, n_patients):
     """Load data for specific number of patients"""
@@ -112,183 +275,248 @@ def load_data_for_size(driver, n_patients):
         print(f"   Run: python updated_data_generation.py and choose option 2")
         return False
     
-    # Load each file type
-    files_to_load = [
-        ("clean_demographics", "csv", load_patients),
-        ("variants_with_50_demo_mrn", "csv", load_variants),
-        ("protocols", "csv", load_protocols),
-        ("clinical_trial_subjects", "csv", load_clinical_trial_subjects),
-        ("interventions", "csv", load_interventions),
-        ("adverse_events", "csv", load_adverse_events)
+    if IMPORT_DIR:
+        load_csv_server_side(driver, data_dir, n_patients)
+        return True
+    
+    # Loaders in a phase only create new, unconnected nodes and run at once. Later phases
+    # MATCH those nodes and attach edges to shared ones, so they run one at a time to avoid
+    # conflicting writes (the variants shards below excepted)
+    load_phases = [
+        [("clean_demographics", load_patients),
+         ("protocols", load_protocols),
+         ("interventions", load_intervention_nodes),
+         ("adverse_events", load_adverse_event_nodes)],
+        [("variants_with_50_demo_mrn", load_variants)],
+        [("clinical_trial_subjects", load_clinical_trial_subjects)],
+        [("interventions", load_interventions)],
+        [("adverse_events", load_adverse_events)],
     ]
     
-    with driver.session() as session:
-        for base_name, ext, load_func in files_to_load:
-            filepath = os.path.join(data_dir, f"{base_name}_{n_patients}pts.{ext}")
-            if os.path.exists(filepath):
-                load_func(session, filepath)
-            else:
-                print(f"⚠️  Missing file: {filepath}")
+    with ThreadPoolExecutor(max_workers=max(VARIANT_SHARDS, 4)) as pool:
+        for phase in load_phases:
+            futures = []
+            for base_name, load_func in phase:
+                filepath = os.path.join(data_dir, f"{base_name}_{n_patients}pts.csv")
+                if not os.path.exists(filepath):
+                    print(f"⚠️  Missing file: {filepath}")
+                    continue
+                # A variant only gets an edge to its own patient, so mrn-disjoint shards load at once
+                paths = variant_shards(filepath) if load_func is load_variants else [filepath]
+                for path in paths:
+                    futures.append(pool.submit(run_loader, driver, load_func, path))
+            for future in futures:
+                future.result()
     
     return True
 
 def load_patients(session, filepath):
     """Load patient nodes"""
-    df = pd.read_csv(filepath)
-    for _, row in df.iterrows():
-        session.run("""
-            CREATE (p:Patient {mrn: $mrn, age: $age, sex: $sex})
-        """, mrn=int(row['mrn']), age=int(row['age']), sex=row['sex'])
+    df = pd.read_csv(filepath, engine='pyarrow', dtype={'mrn': 'int64', 'age': 'int64', 'sex': str})
+    rows = df[['mrn', 'age', 'sex']].to_dict('records')
+    run_batched(session, """
+        UNWIND $rows AS r
+        CREATE (p:Patient {mrn: r.mrn, age: r.age, sex: r.sex})
+    """, rows)
     print(f"   ✅ Loaded {len(df)} patients")
 
 def load_variants(session, filepath):
-    """Load variant nodes and relationships"""
-    df = pd.read_csv(filepath)
-    for _, row in df.iterrows():
-        session.run("""
-            MATCH (p:Patient {mrn: $mrn})
-            CREATE (v:Variant {
-                variant_id: $variant_id,
-                gene: $gene,
-                assessment: $assessment,
-                actionability: $actionability,
-                allelefraction: $allelefraction
-            })
-            CREATE (p)-[:HAS_VARIANT]->(v)
-        """, 
-        mrn=int(row['mrn']),
-        variant_id=row['variant_id'],
-        gene=row['gene'],
-        assessment=row['assessment'],
-        actionability=row.get('actionability', ''),
-        allelefraction=float(row['allelefraction']))
+    """Load variant nodes and relationships from the variants CSV or one of its Parquet shards"""
+    if filepath.endswith('.parquet'):
+        df = pd.read_parquet(filepath)
+    else:
+        df = pd.read_csv(filepath, engine='pyarrow', dtype={'mrn': 'int64', 'allelefraction': 'float64'})
+    rows = (df.assign(actionability=df.get('actionability', ''))
+              [['mrn', 'variant_id', 'gene', 'assessment', 'actionability', 'allelefraction']]
+              .to_dict('records'))
+    run_batched(session, """
+        UNWIND $rows AS r
+        MATCH (p:Patient {mrn: r.mrn})
+        CREATE (v:Variant {
+            variant_id: r.variant_id,
+            gene: r.gene,
+            assessment: r.assessment,
+            actionability: r.actionability,
+            allelefraction: r.allelefraction
+        })
+        CREATE (p)-[:HAS_VARIANT]->(v)
+    """, rows)
     print(f"   ✅ Loaded {len(df)} variants")
 
 def load_protocols(session, filepath):
     """Load protocol nodes"""
-    df = pd.read_csv(filepath)
-    for _, row in df.iterrows():
-        session.run("""
-            CREATE (pr:Protocol {
-                protocol_id: $protocol_id,
-                protocol_name: $protocol_name,
-                phase: $phase,
-                status: $status
-            })
-        """,
-        protocol_id=row['protocol_id'],
-        protocol_name=row['protocol_name'],
-        phase=row['phase'],
-        status=row['status'])
+    df = pd.read_csv(filepath, engine='pyarrow', dtype=str)
+    rows = df[['protocol_id', 'protocol_name', 'phase', 'status']].to_dict('records')
+    run_batched(session, """
+        UNWIND $rows AS r
+        CREATE (pr:Protocol {
+            protocol_id: r.protocol_id,
+            protocol_name: r.protocol_name,
+            phase: r.phase,
+            status: r.status
+        })
+    """, rows)
     print(f"   ✅ Loaded {len(df)} protocols")
 
 def load_clinical_trial_subjects(session, filepath):
     """Load clinical trial subject nodes and relationships"""
-    df = pd.read_csv(filepath)
-    for _, row in df.iterrows():
-        session.run("""
-            MATCH (p:Patient {mrn: $mrn})
-            MATCH (pr:Protocol {protocol_id: $protocol_id})
-            CREATE (cts:ClinicalTrialSubject {
-                rave_id: $rave_id,
-                enrollment_date: $enrollment_date,
-                enrollment_status: $enrollment_status
-            })
-            CREATE (p)-[:ENROLLED_AS]->(cts)
-            CREATE (cts)-[:IN_PROTOCOL]->(pr)
-        """,
-        mrn=int(row['mrn']),
-        protocol_id=row['protocol_id'],
-        rave_id=row['rave_id'],
-        enrollment_date=str(row['enrollment_date']),
-        enrollment_status=row['enrollment_status'])
+    df = pd.read_csv(filepath, engine='pyarrow', dtype={'mrn': 'int64', 'enrollment_date': str})
+    rows = df[['mrn', 'protocol_id', 'rave_id', 'enrollment_date', 'enrollment_status']].to_dict('records')
+    run_batched(session, """
+        UNWIND $rows AS r
+        MATCH (p:Patient {mrn: r.mrn})
+        MATCH (pr:Protocol {protocol_id: r.protocol_id})
+        CREATE (cts:ClinicalTrialSubject {
+            rave_id: r.rave_id,
+            enrollment_date: r.enrollment_date,
+            enrollment_status: r.enrollment_status
+        })
+        CREATE (p)-[:ENROLLED_AS]->(cts)
+        CREATE (cts)-[:IN_PROTOCOL]->(pr)
+    """, rows)
     print(f"   ✅ Loaded {len(df)} clinical trial subjects")
 
+def load_intervention_nodes(session, filepath):
+    """Load the unique intervention category nodes"""
+    df = pd.read_csv(filepath, engine='pyarrow', usecols=['intervention_category'])
+    run_batched(session, """
+        UNWIND $rows AS c
+        MERGE (i:Intervention {intervention_category: c})
+    """, list(set(df['intervention_category'])))
+
 def load_interventions(session, filepath):
-    """Load intervention nodes and relationships"""
-    df = pd.read_csv(filepath)
-    # Create unique intervention nodes
-    for intervention in df['intervention_category'].unique():
-        session.run("""
-            MERGE (i:Intervention {intervention_category: $intervention_category})
-        """, intervention_category=intervention)
-    
-    # Create relationships
-    for _, row in df.iterrows():
-        session.run("""
-            MATCH (cts:ClinicalTrialSubject {rave_id: $rave_id})
-            MATCH (i:Intervention {intervention_category: $intervention_category})
-            CREATE (cts)-[r:RECEIVED_INTERVENTION {
-                dose_level: $dose_level,
-                start_date: $start_date,
-                duration_days: $duration_days
-            }]->(i)
-        """,
-        rave_id=row['rave_id'],
-        intervention_category=row['intervention_category'],
-        dose_level=row['dose_level'],
-        start_date=str(row['start_date']),
-        duration_days=int(row['duration_days']))
+    """Load intervention relationships"""
+    df = pd.read_csv(filepath, engine='pyarrow', dtype={'start_date': str, 'duration_days': 'int64'})
+    rows = df[['rave_id', 'intervention_category', 'dose_level', 'start_date', 'duration_days']].to_dict('records')
+    run_batched(session, """
+        UNWIND $rows AS r
+        MATCH (cts:ClinicalTrialSubject {rave_id: r.rave_id})
+        MATCH (i:Intervention {intervention_category: r.intervention_category})
+        CREATE (cts)-[rel:RECEIVED_INTERVENTION {
+            dose_level: r.dose_level,
+            start_date: r.start_date,
+            duration_days: r.duration_days
+        }]->(i)
+    """, rows)
     print(f"   ✅ Loaded intervention relationships")
 
+def load_adverse_event_nodes(session, filepath):
+    """Load the unique adverse event body system nodes"""
+    df = pd.read_csv(filepath, engine='pyarrow', usecols=['ae_body_system'])
+    run_batched(session, """
+        UNWIND $rows AS c
+        MERGE (ae:AdverseEvent {ae_body_system: c})
+    """, list(set(df['ae_body_system'])))
+
 def load_adverse_events(session, filepath):
-    """Load adverse event nodes and relationships"""
-    df = pd.read_csv(filepath)
-    # Create unique AE nodes
-    for ae_system in df['ae_body_system'].unique():
-        session.run("""
-            MERGE (ae:AdverseEvent {ae_body_system: $ae_body_system})
-        """, ae_body_system=ae_system)
-    
-    # Create relationships
-    for _, row in df.iterrows():
-        session.run("""
-            MATCH (cts:ClinicalTrialSubject {rave_id: $rave_id})
-            MATCH (ae:AdverseEvent {ae_body_system: $ae_body_system})
-            CREATE (cts)-[r:EXPERIENCED_AE {
-                grade: $grade,
-                serious: $serious,
-                onset_date: $onset_date
-            }]->(ae)
-        """,
-        rave_id=row['rave_id'],
-        ae_body_system=row['ae_body_system'],
-        grade=int(row['grade']),
-        serious=bool(row['serious']),
-        onset_date=str(row['onset_date']))
+    """Load adverse event relationships"""
+    df = pd.read_csv(filepath, engine='pyarrow', dtype={'grade': 'int64', 'serious': bool, 'onset_date': str})
+    rows = df[['rave_id', 'ae_body_system', 'grade', 'serious', 'onset_date']].to_dict('records')
+    run_batched(session, """
+        UNWIND $rows AS r
+        MATCH (cts:ClinicalTrialSubject {rave_id: r.rave_id})
+        MATCH (ae:AdverseEvent {ae_body_system: r.ae_body_system})
+        CREATE (cts)-[rel:EXPERIENCED_AE {
+            grade: r.grade,
+            serious: r.serious,
+            onset_date: r.onset_date
+        }]->(ae)
+    """, rows)
     print(f"   ✅ Loaded adverse event relationships")
 
-def profile_query(driver, query_dict, runs=10):
-    """Profile a single query multiple times"""
+def server_time_ms(session, profiled_query):
+    """Server-side execution time of one `PROFILE ...` run, summed over the operators of its plan table"""
+    plan = session.run(profiled_query).data()
+    # ABSOLUTE TIME comes back as text like "  0.003949 ms"
+    return sum(float(str(row['ABSOLUTE TIME']).split()[0]) for row in plan)
+
+def profile_query(session, query_dict, runs=10):
+    """Profile a single query multiple times, timing both the round trip and the server-side execution"""
     times = []
-    
-    with driver.session() as session:
-        # Warm up
-        session.run(query_dict['query'])
+    server_times = []
+    query = query_dict['query']
+    profiled_query = "PROFILE " + query
+    
+    # Warm up: EXPLAIN plans the query into Memgraph's plan cache, then one untimed run
+    session.run("EXPLAIN " + query).consume()
+    session.run(query).consume()
+    
+    # Actual profiling
+    for _ in range(runs):
+        start_time = time.perf_counter_ns()
+        # consume() waits for the query to finish without building a Record per row
+        session.run(query).consume()
+        end_time = time.perf_counter_ns()
         
-        # Actual profiling
-        for _ in range(runs):
-            start_time = time.time()
-            result = session.run(query_dict['query'])
-            # Consume all results to ensure query completes
-            _ = list(result)
-            end_time = time.time()
-            
-            times.append((end_time - start_time) * 1000)  # Convert to milliseconds
+        times.append((end_time - start_time) / 1e6)  # Convert to milliseconds
+        server_times.append(server_time_ms(session, profiled_query))
+    
+    # Convert once and share the array across the statistics
+    client = np.asarray(times)
+    mean = client.mean()
     
     return {
-        'mean': np.mean(times),
-        'std': np.std(times),
-        'min': np.min(times),
-        'max': np.max(times),
-        'median': np.median(times),
-        'times': times
+        'mean': mean,
+        'std': client.std(),
+        'min': client.min(),
+        'max': client.max(),
+        'median': np.median(client),
+        'times': times,
+        'client_ms': mean,
+        'server_ms': np.mean(server_times),
+        'server_times': server_times
     }
 
 # ═══════════════════════════════════════════════════════════════
 # MAIN PROFILING FUNCTION
 # ═══════════════════════════════════════════════════════════════
 
+def profile_sizes(uri, sizes):
+    """Load and profile each size in turn against the Memgraph instance at uri"""
+    driver = GraphDatabase.driver(uri, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    size_results = {}
+    
+    # One session carries the clear and profiling queries; the loaders open their own
+    with driver.session() as session:
+        for n_patients in sizes:
+            print(f"\n{'='*60}")
+            print(f"📊 Testing with {n_patients} patients")
+            print(f"{'='*60}")
+            
+            # Clear and load data, unless the database still holds this size from an earlier run
+            if is_loaded(session, n_patients):
+                print(f"♻️  Reusing the {n_patients} patient dataset already in Memgraph")
+            else:
+                clear_database(session)
+                ensure_indexes(session)
+                
+                if not load_data_for_size(driver, n_patients):
+                    print(f"❌ Skipping {n_patients} patients due to missing data")
+                    continue
+                mark_loaded(session, n_patients)
+            
+            # Profile each query
+            size_results[n_patients] = {}
+            
+            for query_key, query_dict in QUERIES.items():
+                print(f"\n⏱️  Profiling: {query_dict['name']}")
+                
+                try:
+                    profile_results = profile_query(session, query_dict, RUNS_PER_QUERY)
+                    size_results[n_patients][query_key] = profile_results
+                    
+                    print(f"   Mean: {profile_results['mean']:.2f} ms")
+                    print(f"   Std:  {profile_results['std']:.2f} ms")
+                    print(f"   Range: {profile_results['min']:.2f} - {profile_results['max']:.2f} ms")
+                    print(f"   Server: {profile_results['server_ms']:.2f} ms of {profile_results['client_ms']:.2f} ms round trip")
+                
+                except Exception as e:
+                    print(f"   ❌ Error: {e}")
+                    size_results[n_patients][query_key] = None
+    
+    driver.close()
+    return size_results
+
 def run_performance_profiling():
     """Run the complete performance profiling"""
     print("🚀 Starting Memgraph Performance Profiling")
@@ -297,9 +525,6 @@ def run_performance_profiling():
     print(f"Runs per query: {RUNS_PER_QUERY}")
     print("="*60)
     
-    # Connect to Memgraph
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    
     # Results storage
     results = {
         'metadata': {
@@ -311,39 +536,20 @@ def run_performance_profiling():
         'results': {}
     }
     
-    # Run tests for each data size
+    # Deal the sizes out round-robin, one worker process per Memgraph instance
+    shards = [(uri, TEST_SIZES[i::len(NEO4J_URIS)]) for i, uri in enumerate(NEO4J_URIS)]
+    if len(shards) == 1:
+        size_results = profile_sizes(*shards[0])
+    else:
+        size_results = {}
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            for shard_results in pool.map(profile_sizes, *zip(*shards)):
+                size_results.update(shard_results)
+    
+    # Merge back in TEST_SIZES order
     for n_patients in TEST_SIZES:
-        print(f"\n{'='*60}")
-        print(f"📊 Testing with {n_patients} patients")
-        print(f"{'='*60}")
-        
-        # Clear and load data
-        clear_database(driver)
-        
-        if not load_data_for_size(driver, n_patients):
-            print(f"❌ Skipping {n_patients} patients due to missing data")
-            continue
-        
-        # Profile each query
-        results['results'][n_patients] = {}
-        
-        for query_key, query_dict in QUERIES.items():
-            print(f"\n⏱️  Profiling: {query_dict['name']}")
-            
-            try:
-                profile_results = profile_query(driver, query_dict, RUNS_PER_QUERY)
-                results['results'][n_patients][query_key] = profile_results
-                
-                print(f"   Mean: {profile_results['mean']:.2f} ms")
-                print(f"   Std:  {profile_results['std']:.2f} ms")
-                print(f"   Range: {profile_results['min']:.2f} - {profile_results['max']:.2f} ms")
-                
-            except Exception as e:
-                print(f"   ❌ Error: {e}")
-                results['results'][n_patients][query_key] = None
-    
-    # Close connection
-    driver.close()
+        if n_patients in size_results:
+            results['results'][n_patients] = size_results[n_patients]
     
     # Save results
     results_file = os.path.join(OUTPUT_DIR, f"performance_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
@@ -361,21 +567,12 @@ def create_performance_plots(results):
     """Create performance visualization plots"""
     print("\n📊 Creating performance plots...")
     
-    # Extract data for plotting
-    plot_data = {}
-    for query_key in QUERIES.keys():
-        plot_data[query_key] = {
-            'sizes': [],
-            'means': [],
-            'stds': []
-        }
-    
-    for size, size_results in results['results'].items():
-        for query_key, query_results in size_results.items():
-            if query_results:
-                plot_data[query_key]['sizes'].append(size)
-                plot_data[query_key]['means'].append(query_results['mean'])
-                plot_data[query_key]['stds'].append(query_results['std'])
+    # Flatten the results into one long-form row per (size, query) that completed
+    records = [(size, query_key, query_results['mean'], query_results['std'])
+               for size, size_results in results['results'].items()
+               for query_key, query_results in size_results.items() if query_results]
+    plot_data = pd.DataFrame(records, columns=['size', 'query', 'mean', 'std'])
+    by_query = {query_key: plot_data[plot_data['query'] == query_key] for query_key in QUERIES}
     
     # Create figure with subplots
     fig, axes = plt.subplots(2, 2, figsize=(15, 12))
@@ -384,10 +581,10 @@ def create_performance_plots(results):
     # Plot each query
     for idx, (query_key, query_info) in enumerate(QUERIES.items()):
         ax = axes[idx]
-        data = plot_data[query_key]
+        data = by_query[query_key]
         
         # Plot with error bars
-        ax.errorbar(data['sizes'], data['means'], yerr=data['stds'],
+        ax.errorbar(data['size'], data['mean'], yerr=data['std'],
                    marker='o', markersize=8, linewidth=2.5, 
                    capsize=5, capthick=2, label=query_info['name'])
         
@@ -399,7 +596,7 @@ def create_performance_plots(results):
         ax.set_yscale('log')
         
         # Add value labels
-        for x, y in zip(data['sizes'], data['means']):
+        for x, y in zip(data['size'], data['mean']):
             if x in [1, 100, 1000, 10000, 20000]:  # Label key points
                 ax.annotate(f'{y:.1f}', (x, y), textcoords="offset points", 
                            xytext=(0,10), ha='center', fontsize=9)
@@ -409,7 +606,7 @@ def create_performance_plots(results):
     
     # Save plot
     plot_file = os.path.join(OUTPUT_DIR, f"performance_plot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-    plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+    plt.savefig(plot_file, dpi=150, bbox_inches='tight')
     print(f"✅ Plot saved to: {plot_file}")
     
     # Create summary plot - all queries on one graph
@@ -418,8 +615,8 @@ def create_performance_plots(results):
     colors = ['#0068B1', '#E83E48', '#00A783', '#FF9800']
     
     for idx, (query_key, query_info) in enumerate(QUERIES.items()):
-        data = plot_data[query_key]
-        plt.errorbar(data['sizes'], data['means'], yerr=data['stds'],
+        data = by_query[query_key]
+        plt.errorbar(data['size'], data['mean'], yerr=data['std'],
                     marker='o', markersize=8, linewidth=2.5, 
                     capsize=5, capthick=2, label=query_info['name'],
                     color=colors[idx % len(colors)])
@@ -436,8 +633,6 @@ def create_performance_plots(results):
     summary_file = os.path.join(OUTPUT_DIR, f"performance_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
     plt.savefig(summary_file, dpi=300, bbox_inches='tight')
     print(f"✅ Summary plot saved to: {summary_file}")
-    
-    plt.show()
 
 # ═══════════════════════════════════════════════════════════════
 # MAIN EXECUTION
@@ -1,21 +1,68 @@
 import os
 import pandas as pd
 from neo4j import GraphDatabase
+from neo4j.exceptions import Neo4jError
+from concurrent.futures import ThreadPoolExecutor
 
 # Memgraph connection
 MG_URL = os.getenv("MEMGRAPH_URL", "bolt://127.0.0.1:7687")
 mg_driver = GraphDatabase.driver(MG_URL, auth=None)
 
-def populate_expanded_schema():
-    """Populate Memgraph with the expanded clinical trial schema"""
+# Rows sent per UNWIND query, and rows committed per transaction
+BATCH_SIZE = 1000
+TX_ROWS = 10000
+
+# Columns each node type is built from, with the types they are stored as
+DEMO_DTYPES = {'mrn': 'int64', 'age': 'int64', 'sex': str}
+# actionability stays object so its blanks come back null and can be filled with 'Unknown'
+VARIANT_DTYPES = {'mrn': 'int64', 'variant_id': str, 'gene': str, 'assessment': str,
+                  'actionability': object, 'allelefraction': 'float64'}
+PROTOCOL_DTYPES = {'protocol_id': str, 'protocol_name': str, 'phase': str, 'status': str}
+SUBJECT_DTYPES = {'mrn': 'int64', 'protocol_id': str, 'rave_id': str, 'enrollment_status': str}
+INTERVENTION_DTYPES = {'rave_id': str, 'intervention_category': str, 'dose_level': str}
+AE_DTYPES = {'rave_id': str, 'ae_body_system': str, 'grade': 'int64', 'serious': bool}
+
+# Label/property pairs the relationship loads MATCH on
+INDEXES = [
+    ("Patient", "mrn"),
+    ("Protocol", "protocol_id"),
+    ("Clinical_Trial_Subject", "rave_id"),
+]
+
+def ensure_indexes(sess):
+    """Create the label/property indexes the loaders look nodes up by, skipping ones that exist"""
+    for label, prop in INDEXES:
+        try:
+            sess.run(f"CREATE INDEX ON :{label}({prop})").consume()
+        except Neo4jError as e:
+            print(f"  Index on :{label}({prop}) not created: {e}")
+
+def run_batched(sess, query, rows):
+    """Run an `UNWIND $rows AS r ...` query over rows in BATCH_SIZE chunks, committing every TX_ROWS rows"""
+    for tx_start in range(0, len(rows), TX_ROWS):
+        tx_rows = rows[tx_start:tx_start + TX_ROWS]
+        with sess.begin_transaction() as tx:
+            for start in range(0, len(tx_rows), BATCH_SIZE):
+                tx.run(query, rows=tx_rows[start:start + BATCH_SIZE]).consume()
+            tx.commit()
+
+def run_batched_on_own_session(query, rows):
+    """run_batched on a fresh session, for loads running alongside the caller's session"""
+    with mg_driver.session() as own_sess:
+        run_batched(own_sess, query, rows)
+
+def populate_expanded_schema(sess):
+    """Populate Memgraph with the expanded clinical trial schema over an open session"""
     
     print("Loading all data files...")
-    demo_df = pd.read_csv("clean_demographics.csv")
-    variants_df = pd.read_csv("variants_with_50_demo_mrn.csv")
-    protocols_df = pd.read_csv("protocols.csv")
-    subjects_df = pd.read_csv("clinical_trial_subjects.csv")
-    interventions_df = pd.read_csv("interventions.csv")
-    adverse_events_df = pd.read_csv("adverse_events.csv")
+    # Read only the loaded columns, already in the types the nodes store
+    demo_df = pd.read_csv("clean_demographics.csv", engine="pyarrow", usecols=list(DEMO_DTYPES), dtype=DEMO_DTYPES)
+    variants_df = pd.read_csv("variants_with_50_demo_mrn.csv", engine="pyarrow", usecols=list(VARIANT_DTYPES), dtype=VARIANT_DTYPES)
+    variants_df['actionability'] = variants_df['actionability'].fillna('Unknown')
+    protocols_df = pd.read_csv("protocols.csv", engine="pyarrow", usecols=list(PROTOCOL_DTYPES), dtype=PROTOCOL_DTYPES)
+    subjects_df = pd.read_csv("clinical_trial_subjects.csv", engine="pyarrow", usecols=list(SUBJECT_DTYPES), dtype=SUBJECT_DTYPES)
+    interventions_df = pd.read_csv("interventions.csv", engine="pyarrow", usecols=list(INTERVENTION_DTYPES), dtype=INTERVENTION_DTYPES)
+    adverse_events_df = pd.read_csv("adverse_events.csv", engine="pyarrow", usecols=list(AE_DTYPES), dtype=AE_DTYPES)
     
     print(f"Loaded:")
     print(f"  - {len(demo_df)} patients")
@@ -25,151 +72,122 @@ def populate_expanded_schema():
     print(f"  - {len(interventions_df)} interventions")
     print(f"  - {len(adverse_events_df)} adverse events")
     
-    with mg_driver.session() as sess:
-        print("\n🔥 Clearing existing data...")
-        sess.run("MATCH (n) DETACH DELETE n")
-        
-        print("📊 Creating Patient nodes...")
-        for _, patient in demo_df.iterrows():
-            sess.run("""
-                CREATE (p:Patient {
-                    mrn: $mrn,
-                    age: $age,
-                    sex: $sex
-                })
-            """, {
-                'mrn': int(patient['mrn']),
-                'age': int(patient['age']),
-                'sex': str(patient['sex'])
-            })
-        
-        print("🧬 Creating Variant nodes and relationships...")
-        for _, variant in variants_df.iterrows():
-            sess.run("""
-                MATCH (p:Patient {mrn: $mrn})
-                CREATE (v:Variant {
-                    variant_id: $variant_id,
-                    gene: $gene,
-                    assessment: $assessment,
-                    actionability: $actionability,
-                    allelefraction: $allelefraction
-                })
-                CREATE (p)-[:HAS_VARIANT]->(v)
-            """, {
-                'mrn': int(variant['mrn']),
-                'variant_id': str(variant['variant_id']),
-                'gene': str(variant['gene']),
-                'assessment': str(variant['assessment']),
-                'actionability': str(variant['actionability']) if pd.notna(variant['actionability']) else 'Unknown',
-                'allelefraction': float(variant['allelefraction'])
-            })
-        
-        print("🏥 Creating Protocol nodes...")
-        for _, protocol in protocols_df.iterrows():
-            sess.run("""
-                CREATE (pr:Protocol {
-                    protocol_id: $protocol_id,
-                    protocol_name: $protocol_name,
-                    phase: $phase,
-                    status: $status
-                })
-            """, {
-                'protocol_id': str(protocol['protocol_id']),
-                'protocol_name': str(protocol['protocol_name']),
-                'phase': str(protocol['phase']),
-                'status': str(protocol['status'])
-            })
-        
-        print("👥 Creating Clinical_Trial_Subject nodes and relationships...")
-        for _, subject in subjects_df.iterrows():
-            sess.run("""
-                MATCH (p:Patient {mrn: $mrn})
-                MATCH (pr:Protocol {protocol_id: $protocol_id})
-                CREATE (cts:Clinical_Trial_Subject {
-                    rave_id: $rave_id,
-                    enrollment_status: $enrollment_status
-                })
-                CREATE (p)-[:ENROLLED_IN]->(cts)
-                CREATE (cts)-[:PARTICIPATES_IN]->(pr)
-            """, {
-                'mrn': int(subject['mrn']),
-                'protocol_id': str(subject['protocol_id']),
-                'rave_id': str(subject['rave_id']),
-                'enrollment_status': str(subject['enrollment_status'])
-            })
-        
-        print("💊 Creating Intervention nodes and relationships...")
-        for _, intervention in interventions_df.iterrows():
-            sess.run("""
-                MATCH (cts:Clinical_Trial_Subject {rave_id: $rave_id})
-                CREATE (i:Intervention {
-                    intervention_category: $intervention_category,
-                    dose_level: $dose_level
-                })
-                CREATE (cts)-[:RECEIVES]->(i)
-            """, {
-                'rave_id': str(intervention['rave_id']),
-                'intervention_category': str(intervention['intervention_category']),
-                'dose_level': str(intervention['dose_level'])
+    print("\n🔥 Clearing existing data...")
+    sess.run("MATCH (n) DETACH DELETE n").consume()
+    ensure_indexes(sess)
+    
+    # Patients and protocols MATCH nothing, so protocols load on a second session meanwhile
+    print("📊 Creating Patient and Protocol nodes...")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        protocols_loaded = pool.submit(run_batched_on_own_session, """
+            UNWIND $rows AS r
+            CREATE (pr:Protocol {
+                protocol_id: r.protocol_id,
+                protocol_name: r.protocol_name,
+                phase: r.phase,
+                status: r.status
             })
-        
-        print("⚠️  Creating Adverse_Event nodes and relationships...")
-        for _, ae in adverse_events_df.iterrows():
-            sess.run("""
-                MATCH (cts:Clinical_Trial_Subject {rave_id: $rave_id})
-                CREATE (ae:Adverse_Event {
-                    ae_body_system: $ae_body_system,
-                    grade: $grade,
-                    serious: $serious
-                })
-                CREATE (cts)-[:EXPERIENCES]->(ae)
-            """, {
-                'rave_id': str(ae['rave_id']),
-                'ae_body_system': str(ae['ae_body_system']),
-                'grade': int(ae['grade']),
-                'serious': bool(ae['serious'])
+        """, protocols_df.to_dict('records'))
+        run_batched(sess, """
+            UNWIND $rows AS r
+            CREATE (p:Patient {
+                mrn: r.mrn,
+                age: r.age,
+                sex: r.sex
             })
+        """, demo_df.to_dict('records'))
+        protocols_loaded.result()
+    
+    print("🧬 Creating Variant nodes and relationships...")
+    run_batched(sess, """
+        UNWIND $rows AS r
+        MATCH (p:Patient {mrn: r.mrn})
+        CREATE (v:Variant {
+            variant_id: r.variant_id,
+            gene: r.gene,
+            assessment: r.assessment,
+            actionability: r.actionability,
+            allelefraction: r.allelefraction
+        })
+        CREATE (p)-[:HAS_VARIANT]->(v)
+    """, variants_df.to_dict('records'))
+    
+    print("👥 Creating Clinical_Trial_Subject nodes and relationships...")
+    run_batched(sess, """
+        UNWIND $rows AS r
+        MATCH (p:Patient {mrn: r.mrn})
+        MATCH (pr:Protocol {protocol_id: r.protocol_id})
+        CREATE (cts:Clinical_Trial_Subject {
+            rave_id: r.rave_id,
+            enrollment_status: r.enrollment_status
+        })
+        CREATE (p)-[:ENROLLED_IN]->(cts)
+        CREATE (cts)-[:PARTICIPATES_IN]->(pr)
+    """, subjects_df.to_dict('records'))
+    
+    print("💊 Creating Intervention nodes and relationships...")
+    run_batched(sess, """
+        UNWIND $rows AS r
+        MATCH (cts:Clinical_Trial_Subject {rave_id: r.rave_id})
+        CREATE (i:Intervention {
+            intervention_category: r.intervention_category,
+            dose_level: r.dose_level
+        })
+        CREATE (cts)-[:RECEIVES]->(i)
+    """, interventions_df.to_dict('records'))
+    
+    print("⚠️  Creating Adverse_Event nodes and relationships...")
+    run_batched(sess, """
+        UNWIND $rows AS r
+        MATCH (cts:Clinical_Trial_Subject {rave_id: r.rave_id})
+        CREATE (ae:Adverse_Event {
+            ae_body_system: r.ae_body_system,
+            grade: r.grade,
+            serious: r.serious
+        })
+        CREATE (cts)-[:EXPERIENCES]->(ae)
+    """, adverse_events_df.to_dict('records'))
     
     print("\n✅ Schema population complete!")
     
     # Test multi-hop queries
     print("\n🧪 Testing Multi-hop Queries:")
     
-    with mg_driver.session() as sess:
-        # Query 1: Patients on Immunotherapy
-        result = sess.run("""
-            MATCH (p:Patient)-[:ENROLLED_IN]->(cts:Clinical_Trial_Subject)-[:RECEIVES]->(i:Intervention)
-            WHERE i.intervention_category = 'Immunotherapy'
-            RETURN count(DISTINCT p) as count
-        """)
-        count1 = result.single()["count"]
-        print(f"  ✓ {count1} patients on Immunotherapy")
-        
-        # Query 2: Female patients with cardiac adverse events
-        result = sess.run("""
-            MATCH (p:Patient)-[:ENROLLED_IN]->(cts:Clinical_Trial_Subject)-[:EXPERIENCES]->(ae:Adverse_Event)
-            WHERE p.sex = 'female' AND ae.ae_body_system = 'Cardiac disorders'
-            RETURN count(DISTINCT p) as count
-        """)
-        count2 = result.single()["count"]
-        print(f"  ✓ {count2} female patients with cardiac adverse events")
-        
-        # Query 3: Patients with variants in specific protocol
-        result = sess.run("""
-            MATCH (p:Patient)-[:HAS_VARIANT]->(v:Variant), 
-                  (p)-[:ENROLLED_IN]->(cts:Clinical_Trial_Subject)-[:PARTICIPATES_IN]->(pr:Protocol)
-            WHERE pr.protocol_id = 'PROT_001'
-            RETURN count(DISTINCT p) as count
-        """)
-        count3 = result.single()["count"]
-        print(f"  ✓ {count3} patients with variants in PROT_001")
+    # Query 1: Patients on Immunotherapy
+    result = sess.run("""
+        MATCH (p:Patient)-[:ENROLLED_IN]->(cts:Clinical_Trial_Subject)-[:RECEIVES]->(i:Intervention)
+        WHERE i.intervention_category = 'Immunotherapy'
+        RETURN count(DISTINCT p) as count
+    """)
+    count1 = result.single()["count"]
+    print(f"  ✓ {count1} patients on Immunotherapy")
+    
+    # Query 2: Female patients with cardiac adverse events
+    result = sess.run("""
+        MATCH (p:Patient)-[:ENROLLED_IN]->(cts:Clinical_Trial_Subject)-[:EXPERIENCES]->(ae:Adverse_Event)
+        WHERE p.sex = 'female' AND ae.ae_body_system = 'Cardiac disorders'
+        RETURN count(DISTINCT p) as count
+    """)
+    count2 = result.single()["count"]
+    print(f"  ✓ {count2} female patients with cardiac adverse events")
+    
+    # Query 3: Patients with variants in specific protocol
+    result = sess.run("""
+        MATCH (p:Patient)-[:HAS_VARIANT]->(v:Variant), 
+              (p)-[:ENROLLED_IN]->(cts:Clinical_Trial_Subject)-[:PARTICIPATES_IN]->(pr:Protocol)
+        WHERE pr.protocol_id = 'PROT_001'
+        RETURN count(DISTINCT p) as count
+    """)
+    count3 = result.single()["count"]
+    print(f"  ✓ {count3} patients with variants in PROT_001")
     
     print(f"\n🎉 SUCCESS! Your multi-hop graph is ready!")
     print(f"Now your app will show real connections between genomics and clinical trials!")
 
 if __name__ == "__main__":
     try:
-        populate_expanded_schema()
+        with mg_driver.session() as sess:
+            populate_expanded_schema(sess)
     except Exception as e:
         print(f"❌ Error: {e}")
         print("Make sure Memgraph is running and you have all the CSV files!")
\ No newline at end of file
@@ -1,32 +1,38 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pv
 
-def generate_realistic_survival_data():
-    """Generate realistic survival data linked to patient characteristics"""
+def generate_realistic_survival_data(demo_df=None, variants_df=None, subjects_df=None, interventions_df=None, rng=None):
+    """Generate realistic survival data linked to patient characteristics
     
-    # Load your actual data
-    demo_df = pd.read_csv("clean_demographics.csv")
-    variants_df = pd.read_csv("variants_with_50_demo_mrn.csv")
+    Frames already in memory (e.g. straight from a generator) can be passed in to skip re-reading
+    the CSVs; any left as None are loaded from disk. rng is the NumPy Generator to draw from.
+    """
+    
+    # Load your actual data unless it was passed in
+    if demo_df is None:
+        demo_df = pd.read_csv("clean_demographics.csv")
+    if variants_df is None:
+        variants_df = pd.read_csv("variants_with_50_demo_mrn.csv")
     
     # Load clinical trial data if available
-    try:
-        subjects_df = pd.read_csv("clinical_trial_subjects.csv")
-        interventions_df = pd.read_csv("interventions.csv")
-        adverse_events_df = pd.read_csv("adverse_events.csv")
-        clinical_data_available = True
-    except:
-        clinical_data_available = False
-    
-    # Merge patient data with variants
-    patient_variant_summary = variants_df.groupby('mrn').agg({
-        'gene': 'count',  # number of variants
-        'assessment': lambda x: (x.isin(['Pathogenic', 'Likely Pathogenic'])).sum(),  # actionable variants
-        'allelefraction': 'mean'  # average allele fraction
-    }).rename(columns={
-        'gene': 'total_variants',
-        'assessment': 'actionable_variants',
-        'allelefraction': 'avg_allele_fraction'
-    }).reset_index()
+    clinical_data_available = subjects_df is not None and interventions_df is not None
+    if not clinical_data_available:
+        try:
+            subjects_df = pd.read_csv("clinical_trial_subjects.csv")
+            interventions_df = pd.read_csv("interventions.csv")
+            clinical_data_available = True
+        except:
+            clinical_data_available = False
+    
+    # Merge patient data with variants; the actionable flag is precomputed so every aggregation is a built-in
+    is_actionable = variants_df['assessment'].isin(['Pathogenic', 'Likely Pathogenic'])
+    patient_variant_summary = variants_df.assign(is_actionable=is_actionable).groupby('mrn', sort=False).agg(
+        total_variants=('gene', 'count'),  # number of variants
+        actionable_variants=('is_actionable', 'sum'),  # actionable variants
+        avg_allele_fraction=('allelefraction', 'mean')  # average allele fraction
+    ).reset_index()
     
     # Merge with demographics
     survival_data = demo_df.merge(patient_variant_summary, on='mrn', how='left')
@@ -34,35 +40,21 @@ def generate_realistic_survival_data():
     
     # Add clinical trial information if available
     if clinical_data_available:
-        # Get intervention information for each patient
-        patient_interventions = []
-        for mrn in survival_data['mrn']:
-            patient_subjects = subjects_df[subjects_df['mrn'] == mrn]
-            if len(patient_subjects) > 0:
-                patient_raves = patient_subjects['rave_id'].tolist()
-                patient_interventions_list = interventions_df[
-                    interventions_df['rave_id'].isin(patient_raves)
-                ]['intervention_category'].tolist()
-                
-                # Check for specific beneficial interventions
-                has_immunotherapy = 'Immunotherapy' in patient_interventions_list
-                has_targeted_therapy = 'Targeted Therapy' in patient_interventions_list
-                intervention_count = len(set(patient_interventions_list))
-            else:
-                has_immunotherapy = False
-                has_targeted_therapy = False
-                intervention_count = 0
-                
-            patient_interventions.append({
-                'mrn': mrn,
-                'has_immunotherapy': has_immunotherapy,
-                'has_targeted_therapy': has_targeted_therapy,
-                'intervention_count': intervention_count
-            })
+        # Join every enrollment to its interventions once, then reduce per patient
+        merged = subjects_df.merge(interventions_df[['rave_id', 'intervention_category']], on='rave_id', how='left')
+        merged['has_immunotherapy'] = merged['intervention_category'].eq('Immunotherapy')
+        merged['has_targeted_therapy'] = merged['intervention_category'].eq('Targeted Therapy')
+        intervention_df = merged.groupby('mrn').agg(
+            has_immunotherapy=('has_immunotherapy', 'any'),
+            has_targeted_therapy=('has_targeted_therapy', 'any'),
+            intervention_count=('intervention_category', 'nunique')
+        ).reset_index()
         
-        intervention_df = pd.DataFrame(patient_interventions)
+        # Patients never enrolled get no interventions
         survival_data = survival_data.merge(intervention_df, on='mrn', how='left')
-        survival_data = survival_data.fillna(False)
+        survival_data = survival_data.fillna({
+            'has_immunotherapy': False, 'has_targeted_therapy': False, 'intervention_count': 0
+        }).astype({'has_immunotherapy': bool, 'has_targeted_therapy': bool, 'intervention_count': int})
     else:
         # Add dummy columns if no clinical trial data
         survival_data['has_immunotherapy'] = False
@@ -70,76 +62,57 @@ def generate_realistic_survival_data():
         survival_data['intervention_count'] = 0
     
     # Generate realistic survival times based on patient characteristics
-    np.random.seed(42)  # For reproducibility
+    if rng is None:
+        rng = np.random.default_rng(42)  # For reproducibility
     
-    survival_times = []
-    events = []
+    # Every factor is computed for all patients at once
+    n_patients = len(survival_data)
+    base_survival = 24  # 2 years baseline, in months
     
-    for _, patient in survival_data.iterrows():
-        # Base survival time (in months)
-        base_survival = 24  # 2 years baseline
-        
-        # Age effect: older patients have shorter survival
-        age_factor = 1 - (patient['age'] - 50) * 0.01  # Decrease by 1% per year over 50
-        age_factor = max(0.5, age_factor)  # Cap at 50% of baseline
-        
-        # Sex effect: slight difference
-        sex_factor = 1.1 if patient['sex'] == 'female' else 1.0
-        
-        # Variant burden effect: more variants = worse prognosis
-        variant_factor = 1 - (patient['total_variants'] * 0.05)  # 5% decrease per variant
-        variant_factor = max(0.6, variant_factor)  # Cap at 60% of baseline
-        
-        # Actionable variants effect: actionable variants can be good (targetable) or bad
-        if patient['actionable_variants'] > 0:
-            actionable_factor = 0.9  # Slightly worse initially
-        else:
-            actionable_factor = 1.0
-        
-        # Treatment effects (if clinical trial data available)
-        treatment_factor = 1.0
-        if clinical_data_available:
-            if patient['has_immunotherapy']:
-                treatment_factor *= 1.3  # 30% improvement with immunotherapy
-            if patient['has_targeted_therapy']:
-                treatment_factor *= 1.2  # 20% improvement with targeted therapy
-            if patient['intervention_count'] > 2:
-                treatment_factor *= 0.9  # Multiple treatments might indicate more aggressive disease
-        
-        # Calculate final survival time
-        final_survival = base_survival * age_factor * sex_factor * variant_factor * actionable_factor * treatment_factor
-        
-        # Add some random variation
-        random_factor = np.random.lognormal(0, 0.3)  # Log-normal distribution for variation
-        final_survival *= random_factor
-        
-        # Ensure minimum survival time
-        final_survival = max(1, final_survival)  # At least 1 month
-        
-        # Convert to days
-        survival_time_days = final_survival * 30.44  # Average days per month
-        
-        # Determine if event occurred or patient was censored
-        # Higher-risk patients more likely to have events
-        risk_score = (
-            (80 - patient['age']) / 80 +  # Higher age = higher risk
-            patient['total_variants'] * 0.1 +  # More variants = higher risk
-            (1 - treatment_factor) * 2  # Less treatment benefit = higher risk
-        )
-        
-        event_probability = min(0.8, max(0.2, risk_score))  # Between 20% and 80%
-        event = np.random.random() < event_probability
-        
-        survival_times.append(survival_time_days)
-        events.append(int(event))
+    # Age effect: decrease by 1% per year over 50, capped at 50% of baseline
+    age = survival_data['age'].to_numpy(dtype=float)
+    age_factor = np.maximum(0.5, 1 - (age - 50) * 0.01)
+    
+    # Sex effect: slight difference
+    sex_factor = np.where(survival_data['sex'].to_numpy() == 'female', 1.1, 1.0)
+    
+    # Variant burden effect: 5% decrease per variant, capped at 60% of baseline
+    total_variants = survival_data['total_variants'].to_numpy(dtype=float)
+    variant_factor = np.maximum(0.6, 1 - total_variants * 0.05)
+    
+    # Actionable variants effect: slightly worse initially
+    actionable_factor = np.where(survival_data['actionable_variants'].to_numpy(dtype=float) > 0, 0.9, 1.0)
+    
+    # Treatment effects (if clinical trial data available)
+    treatment_factor = np.ones(n_patients)
+    if clinical_data_available:
+        treatment_factor *= np.where(survival_data['has_immunotherapy'].to_numpy(dtype=bool), 1.3, 1.0)  # 30% improvement
+        treatment_factor *= np.where(survival_data['has_targeted_therapy'].to_numpy(dtype=bool), 1.2, 1.0)  # 20% improvement
+        # Multiple treatments might indicate more aggressive disease
+        treatment_factor *= np.where(survival_data['intervention_count'].to_numpy(dtype=float) > 2, 0.9, 1.0)
+    
+    # Log-normal random variation, with at least 1 month of survival, converted to days
+    random_factor = rng.lognormal(0, 0.3, size=n_patients)
+    final_survival = base_survival * age_factor * sex_factor * variant_factor * actionable_factor * treatment_factor
+    final_survival = np.maximum(1, final_survival * random_factor)
+    survival_time_days = final_survival * 30.44  # Average days per month
+    
+    # Higher-risk patients are more likely to have an event than to be censored
+    risk_score = (
+        (80 - age) / 80 +  # Higher age = higher risk
+        total_variants * 0.1 +  # More variants = higher risk
+        (1 - treatment_factor) * 2  # Less treatment benefit = higher risk
+    )
+    event_probability = np.clip(risk_score, 0.2, 0.8)  # Between 20% and 80%
+    events = (rng.random(n_patients) < event_probability).astype(int)
     
     # Add survival data to dataframe
-    survival_data['survival_time_days'] = survival_times
+    survival_data['survival_time_days'] = survival_time_days
     survival_data['event'] = events
     survival_data['survival_time_months'] = survival_data['survival_time_days'] / 30.44
     
     # Save to CSV
-    survival_data.to_csv("realistic_survival_data.csv", index=False)
+    pv.write_csv(pa.Table.from_pandas(survival_data, preserve_index=False), "realistic_survival_data.csv")
     
     print("✅ Generated realistic survival data!")
     print(f"📊 Summary:")
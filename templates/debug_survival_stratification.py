@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Debug why survival stratification isn't working for all options"""
+
+from neo4j import GraphDatabase
+import pandas as pd
+
+driver = GraphDatabase.driver("bolt://localhost:7687", auth=("", ""))
+
+print("🔍 Debugging Survival Stratification Issues")
+print("="*60)
+
+# All checks are fused into one UNION ALL query so the whole debug pass
+# costs a single Bolt round-trip; each branch tags its row with a key.
+# Aggregates are taken before the key is added so every check returns
+# exactly one row (of zeros) even when its MATCH finds nothing
+DEBUG_QUERY = """
+    MATCH (p:Patient)-[:ENROLLED_AS]->(cts:ClinicalTrialSubject)-[:IN_PROTOCOL]->(pr:Protocol)
+    WITH count(DISTINCT p) as patient_count, count(DISTINCT pr) as protocol_count,
+         collect(DISTINCT pr.protocol_id)[0..5] as sample_protocols
+    RETURN 'protocols' as k,
+           {patient_count: patient_count,
+            protocol_count: protocol_count,
+            sample_protocols: sample_protocols} as v
+    UNION ALL
+    MATCH (p:Patient)-[:ENROLLED_AS]->(cts:ClinicalTrialSubject)-[:RECEIVED_INTERVENTION]->(i:Intervention)
+    WITH count(DISTINCT p) as patient_count, count(DISTINCT i) as intervention_count,
+         collect(DISTINCT i.intervention_category)[0..5] as sample_interventions
+    RETURN 'interventions' as k,
+           {patient_count: patient_count,
+            intervention_count: intervention_count,
+            sample_interventions: sample_interventions} as v
+    UNION ALL
+    MATCH (p:Patient)-[:HAS_VARIANT]->(var:Variant)
+    WITH count(DISTINCT p) as patient_count, count(DISTINCT var.gene) as gene_count,
+         collect(DISTINCT var.gene)[0..5] as sample_genes
+    RETURN 'variants' as k,
+           {patient_count: patient_count,
+            gene_count: gene_count,
+            sample_genes: sample_genes} as v
+    UNION ALL
+    MATCH (p:Patient)
+    WITH count(p) as total_patients, count(DISTINCT p.sex) as sex_values,
+         collect(DISTINCT p.sex) as sex_list
+    RETURN 'demographics' as k,
+           {total_patients: total_patients,
+            sex_values: sex_values,
+            sex_list: sex_list} as v
+    UNION ALL
+    MATCH (p:Patient {mrn: 1000000})-[:ENROLLED_AS]->(cts:ClinicalTrialSubject)-[:IN_PROTOCOL]->(pr:Protocol)
+    WITH DISTINCT pr.protocol_id as protocol, pr.phase as phase
+    RETURN 'mrn_protocols' as k, {protocol: protocol, phase: phase} as v
+"""
+
+with driver.session() as session:
+    checks = {}
+    mrn_protocols = []
+    for record in session.run(DEBUG_QUERY):
+        if record['k'] == 'mrn_protocols':
+            mrn_protocols.append(record['v'])
+        else:
+            checks[record['k']] = record['v']
+
+# 1. Check if protocols exist and are linked to patients
+print("\n1. Checking Protocol Data:")
+data = checks['protocols']
+print(f"   Patients in protocols: {data['patient_count']}")
+print(f"   Unique protocols: {data['protocol_count']}")
+print(f"   Sample protocols: {data['sample_protocols']}")
+
+# 2. Check if interventions are properly linked
+print("\n2. Checking Intervention Data:")
+data = checks['interventions']
+print(f"   Patients with interventions: {data['patient_count']}")
+print(f"   Unique intervention types: {data['intervention_count']}")
+print(f"   Sample interventions: {data['sample_interventions']}")
+
+# 3. Check patient data for gene stratification
+print("\n3. Checking Patient-Variant Data:")
+data = checks['variants']
+print(f"   Patients with variants: {data['patient_count']}")
+print(f"   Unique genes: {data['gene_count']}")
+print(f"   Sample genes: {data['sample_genes']}")
+
+# 4. Check patient demographics
+print("\n4. Checking Patient Demographics:")
+data = checks['demographics']
+print(f"   Total patients: {data['total_patients']}")
+print(f"   Sex values: {data['sex_list']}")
+
+# 5. Test specific queries used in survival function
+print("\n5. Testing Survival Function Queries:")
+
+# Test protocol query
+print("\n   Testing protocol query for MRN 1000000:")
+print(f"   Found {len(mrn_protocols)} protocols for patient 1000000")
+if mrn_protocols:
+    print(f"   Example: {mrn_protocols[0]}")
+
+driver.close()
+
+# Also check the CSV files
+print("\n" + "="*60)
+print("6. Checking CSV Files:")
+
+try:
+    # Check variants file
+    variants_df = pd.read_csv('variants_with_50_demo_mrn_200pts.csv')
+    print(f"\n   Variants file:")
+    print(f"   - Total rows: {len(variants_df)}")
+    print(f"   - Unique MRNs: {variants_df['mrn'].nunique()}")
+    print(f"   - Unique genes: {variants_df['gene'].nunique()}")
+    print(f"   - Sample genes: {variants_df['gene'].unique()[:5].tolist()}")
+except Exception as e:
+    print(f"   ❌ Error reading variants file: {e}")
+
+try:
+    # Check demographics
+    demo_df = pd.read_csv('clean_demographics.csv')
+    print(f"\n   Demographics file:")
+    print(f"   - Total patients: {len(demo_df)}")
+    print(f"   - Sex distribution: {demo_df['sex'].value_counts().to_dict()}")
+except Exception as e:
+    print(f"   ❌ Error reading demographics file: {e}")
+
+print("\n" + "="*60)
+print("\n📋 Recommendations:")
+print("1. If protocol/intervention counts are 0, run: python load_remaining_data.py")
+print("2. If patient counts don't match, reload all data")
+print("3. Check that MRN values match between files")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test all survival stratification options to see what data is available"""
+
+import pandas as pd
+import numpy as np
+import os
+
+# Explicit dtypes so pandas skips type inference and stores repeated strings as codes
+VARIANT_DTYPES = {'mrn': 'int32', 'gene': 'category', 'assessment': 'category'}
+DEMOGRAPHIC_DTYPES = {'mrn': 'int32', 'age': 'int8', 'sex': 'category'}
+SUBJECT_DTYPES = {'mrn': 'int32', 'protocol_id': 'category', 'enrollment_status': 'category'}
+PROTOCOL_DTYPES = {'protocol_id': 'category', 'phase': 'category'}
+INTERVENTION_DTYPES = {'intervention_category': 'category'}
+
+print("🔍 Testing All Survival Stratification Data")
+print("="*60)
+
+# 1. Test Gene stratification
+print("\n1. GENE STRATIFICATION TEST:")
+try:
+    # Load variants data
+    if os.path.exists('variants_with_50_demo_mrn_200pts.csv'):
+        variants_df = pd.read_csv('variants_with_50_demo_mrn_200pts.csv', dtype=VARIANT_DTYPES)
+    elif os.path.exists('TSO500_Synthetic_Final.csv'):
+        variants_df = pd.read_csv('TSO500_Synthetic_Final.csv', dtype=VARIANT_DTYPES)
+    else:
+        variants_df = pd.read_csv('variants_with_50_demo_mrn.csv', dtype=VARIANT_DTYPES)
+    
+    top_genes = variants_df['gene'].value_counts().head(5)
+    print(f"✅ Gene data available!")
+    print(f"   Top 5 genes:")
+    for gene, count in top_genes.items():
+        patients = variants_df[variants_df['gene'] == gene]['mrn'].nunique()
+        print(f"   - {gene}: {count} variants in {patients} patients")
+        
+except Exception as e:
+    print(f"❌ Error with gene data: {e}")
+
+# 2. Test Sex stratification
+print("\n2. SEX STRATIFICATION TEST:")
+try:
+    demo_df = pd.read_csv('clean_demographics.csv', dtype=DEMOGRAPHIC_DTYPES)
+    sex_counts = demo_df['sex'].value_counts()
+    print(f"✅ Sex data available!")
+    print(f"   Distribution:")
+    for sex, count in sex_counts.items():
+        print(f"   - {sex}: {count} patients")
+        
+except Exception as e:
+    print(f"❌ Error with sex data: {e}")
+
+# 3. Test Protocol stratification
+print("\n3. PROTOCOL STRATIFICATION TEST:")
+try:
+    subjects_df = pd.read_csv('clinical_trial_subjects.csv', dtype=SUBJECT_DTYPES)
+    protocols_df = pd.read_csv('protocols.csv', dtype=PROTOCOL_DTYPES)
+    
+    protocol_counts = subjects_df['protocol_id'].value_counts().head(5)
+    print(f"✅ Protocol data available!")
+    print(f"   Top 5 protocols:")
+    for protocol_id, count in protocol_counts.items():
+        # Get phase info
+        phase_info = protocols_df[protocols_df['protocol_id'] == protocol_id]
+        phase = phase_info['phase'].iloc[0] if len(phase_info) > 0 else "Unknown"
+        print(f"   - {protocol_id} ({phase}): {count} patients")
+        
+except Exception as e:
+    print(f"❌ Error with protocol data: {e}")
+    print("   Run: python load_remaining_data.py")
+
+# 4. Test Intervention stratification
+print("\n4. INTERVENTION STRATIFICATION TEST:")
+try:
+    subjects_df = pd.read_csv('clinical_trial_subjects.csv', dtype=SUBJECT_DTYPES)
+    interventions_df = pd.read_csv('interventions.csv', dtype=INTERVENTION_DTYPES)
+    
+    intervention_counts = interventions_df['intervention_category'].value_counts()
+    print(f"✅ Intervention data available!")
+    print(f"   Intervention types:")
+    for intervention, count in intervention_counts.items():
+        # Get unique patients
+        intervention_raves = interventions_df[
+            interventions_df['intervention_category'] == intervention
+        ]['rave_id'].unique()
+        
+        patient_count = subjects_df[
+            subjects_df['rave_id'].isin(intervention_raves)
+        ]['mrn'].nunique()
+        
+        print(f"   - {intervention}: {patient_count} patients")
+        
+except Exception as e:
+    print(f"❌ Error with intervention data: {e}")
+    print("   Run: python load_remaining_data.py")
+
+print("\n" + "="*60)
+
+# 5. Test data connectivity
+print("\n5. DATA CONNECTIVITY TEST:")
+try:
+    # Check if MRNs match across files
+    demo_mrns = np.unique(demo_df['mrn'].to_numpy())
+    variant_mrns = np.unique(variants_df['mrn'].to_numpy())
+    common_mrns = np.intersect1d(demo_mrns, variant_mrns, assume_unique=True)
+    
+    if os.path.exists('clinical_trial_subjects.csv'):
+        subject_mrns = np.unique(subjects_df['mrn'].to_numpy())
+        common_mrns = np.intersect1d(common_mrns, subject_mrns, assume_unique=True)
+        print(f"\n   MRN overlap:")
+        print(f"   - Demographics: {demo_mrns.size} patients")
+        print(f"   - Variants: {variant_mrns.size} patients")
+        print(f"   - Clinical trials: {subject_mrns.size} patients")
+        print(f"   - Common to all: {common_mrns.size} patients")
+    else:
+        print(f"\n   MRN overlap (no clinical data):")
+        print(f"   - Demographics: {demo_mrns.size} patients")
+        print(f"   - Variants: {variant_mrns.size} patients")
+        print(f"   - Common: {common_mrns.size} patients")
+        
+except Exception as e:
+    print(f"❌ Error checking connectivity: {e}")
+
+print("\n" + "="*60)
+print("\n📋 Summary:")
+print("If any tests failed, the corresponding stratification won't work.")
+print("Make sure all data files are present and properly linked.")
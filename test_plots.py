@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 import matplotlib
+from matplotlib.colors import ListedColormap
 import numpy as np
 import pandas as pd
 
@@ -47,12 +48,13 @@ fig2, ax2 = plt.subplots(figsize=(10, 5), dpi=100)
 genes = ['TP53', 'KRAS', 'EGFR', 'BRAF', 'PIK3CA']
 patients = [f'P{i}' for i in range(20)]
 
-# Plot dummy oncoprint
-for i, gene in enumerate(genes):
-    for j, patient in enumerate(patients):
-        color = np.random.choice(['#e74c3c', '#f39c12', '#95a5a6', '#3498db', '#2ecc71'])
-        rect = plt.Rectangle((j, i), 1, 1, facecolor=color, edgecolor='black', linewidth=0.5)
-        ax2.add_patch(rect)
+# Plot dummy oncoprint as one image of colour codes rather than a patch per cell
+colors = ['#e74c3c', '#f39c12', '#95a5a6', '#3498db', '#2ecc71']
+codes = np.random.randint(0, len(colors), size=(len(genes), len(patients)))
+ax2.imshow(codes, cmap=ListedColormap(colors), aspect='auto', interpolation='nearest',
+           origin='lower', extent=(0, len(patients), 0, len(genes)))
+ax2.vlines(range(len(patients) + 1), 0, len(genes), colors='black', linewidth=0.5)
+ax2.hlines(range(len(genes) + 1), 0, len(patients), colors='black', linewidth=0.5)
 
 ax2.set_xlim(0, len(patients))
 ax2.set_ylim(0, len(genes))
@@ -1,9 +1,68 @@
 import pandas as pd
 import os
+import itertools
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pv
 from datetime import datetime, timedelta
 
-def generate_scalable_synthetic_data(n_patients, output_dir="./"):
+# Narrow dtypes per table: small integer ranges fit int8/int16/int32 (repeated strings are drawn as categoricals)
+PATIENT_DTYPES = {'age': 'int8'}
+VARIANT_DTYPES = {'chromosome': 'int8', 'position': 'int32'}
+INTERVENTION_DTYPES = {'duration_days': 'int16'}
+ADVERSE_EVENT_DTYPES = {'grade': 'int8'}
+
+# Patients (or clinical trial subjects) per block when streaming the variant, intervention and AE tables to disk
+CHUNK_SIZE = 2000
+
+def csv_table(df):
+    """Convert df to an Arrow table, keeping dates as plain YYYY-MM-DD like to_csv does"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            table = table.set_column(i, field.name, table[field.name].cast(pa.date32()))
+    return table
+
+def write_csv(df, path):
+    """Write df with Arrow's native CSV writer"""
+    pv.write_csv(csv_table(df), path)
+
+def write_csv_chunks(chunks, path):
+    """Stream DataFrame chunks into one CSV under a single header, returning the number of rows written"""
+    writer = None
+    n_rows = 0
+    try:
+        for df in chunks:
+            table = csv_table(df)
+            if writer is None:
+                writer = pv.CSVWriter(path, table.schema)
+            writer.write_table(table)
+            n_rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+def protocol_count(n_patients):
+    """Number of protocols generated for n_patients: ~2 enrollments per patient at ~160 patients per protocol"""
+    return max(10, min(200, (n_patients * 2) // 160))
+
+def draw_categorical(categories, size, rng, p=None):
+    """Draw size values as integer codes into categories, so no array of strings is ever built"""
+    return pd.Categorical.from_codes(rng.choice(len(categories), size=size, p=p), categories=categories)
+
+def sample_without_replacement(counts, choices, rng):
+    """Pick counts[i] distinct choices for every row i, returning (row index, choice) arrays"""
+    choices = np.asarray(choices)
+    counts = np.minimum(counts, len(choices))
+    
+    # Ranking random keys gives each row an independent permutation of the choices
+    order = np.argsort(rng.random((len(counts), len(choices))), axis=1)
+    rows, slots = np.nonzero(np.arange(len(choices)) < counts[:, None])
+    
+    return rows, choices[order[rows, slots]]
+
+def generate_scalable_synthetic_data(n_patients, output_dir="./", rng=None):
     """
     Generate synthetic data based on mentor specifications
     
@@ -14,27 +73,29 @@ def generate_scalable_synthetic_data(n_patients, output_dir="./"):
     - Clinical Trial Subjects: 1-3 protocols per patient
     - Interventions: 1-3 per clinical trial subject
     - Adverse Events: 1-10 per clinical trial subject
+    
+    rng is the NumPy Generator to draw from; pass one in to share a single stream with other generators.
     """
     
     print(f"🔄 Generating synthetic data for {n_patients} patients...")
     
-    # Set seed for reproducibility
-    np.random.seed(42)
+    # One seeded generator drives every draw below, for reproducibility
+    if rng is None:
+        rng = np.random.default_rng(42)
+    
+    # Create output directory if it doesn't exist; the larger tables are written while they are generated
+    os.makedirs(output_dir, exist_ok=True)
     
     # ═══════════════════════════════════════════════════════════════
     # 1. PATIENTS (Demographics)
     # ═══════════════════════════════════════════════════════════════
     
     print("   📊 Generating patient demographics...")
-    patients = []
-    for i in range(n_patients):
-        patients.append({
-            'mrn': 1000000 + i,  # Sequential MRNs starting at 1000000
-            'age': np.random.randint(18, 85),
-            'sex': np.random.choice(['male', 'female'])
-        })
-    
-    patients_df = pd.DataFrame(patients)
+    patients_df = pd.DataFrame({
+        'mrn': np.arange(1000000, 1000000 + n_patients),  # Sequential MRNs starting at 1000000
+        'age': rng.integers(18, 85, size=n_patients),
+        'sex': draw_categorical(['male', 'female'], n_patients, rng)
+    }).astype(PATIENT_DTYPES)
     
     # ═══════════════════════════════════════════════════════════════
     # 2. VARIANTS (20-50 per patient)
@@ -50,34 +111,41 @@ def generate_scalable_synthetic_data(n_patients, output_dir="./"):
     ]
     
     assessments = ['Pathogenic', 'Likely Pathogenic', 'VUS', 'Likely Benign', 'Benign']
-    actionability_levels = ['1A', '2C', '3', '', '']  # Some have actionability, some don't
-    
-    variants = []
-    variant_id_counter = 1
-    
-    for patient in patients:
-        mrn = patient['mrn']
-        # 20-50 variants per patient as specified
-        n_variants = np.random.randint(20, 51)
-        
-        for v in range(n_variants):
-            gene = np.random.choice(genes)
-            assessment = np.random.choice(assessments, p=[0.15, 0.10, 0.50, 0.15, 0.10])
+    actionability_levels = ['1A', '2C', '3', '']
+    actionability_codes = np.array([0, 1, 2, 3, 3])  # Some have actionability, some don't
+    
+    def variant_chunks():
+        # 20-50 variants per patient as specified; each block of patients is drawn column-wise and written before the next
+        first_variant_id = 1
+        for start in range(0, n_patients, CHUNK_SIZE):
+            mrns = patients_df['mrn'].to_numpy()[start:start + CHUNK_SIZE]
+            n_variants = rng.integers(20, 51, size=len(mrns))
+            total_variants = n_variants.sum()
+            
+            # "p.<Arg|Leu|Gly|Val><1-999><His|Asp|Glu|Met>"
+            protein_change = np.char.add(
+                np.char.add('p.', rng.choice(['Arg', 'Leu', 'Gly', 'Val'], size=total_variants)),
+                np.char.add(rng.integers(1, 1000, size=total_variants).astype(str),
+                            rng.choice(['His', 'Asp', 'Glu', 'Met'], size=total_variants))
+            )
+            variant_ids = np.arange(first_variant_id, first_variant_id + total_variants)
+            first_variant_id += total_variants
             
-            variants.append({
-                'variant_id': f"VAR_{variant_id_counter:08d}",
-                'mrn': mrn,
-                'gene': gene,
-                'assessment': assessment,
-                'actionability': np.random.choice(actionability_levels),
-                'allelefraction': np.random.uniform(0.05, 0.95),
-                'chromosome': np.random.choice(range(1, 23)),
-                'position': np.random.randint(1000000, 250000000),
-                'protein_change': f"p.{np.random.choice(['Arg', 'Leu', 'Gly', 'Val'])}{np.random.randint(1, 1000)}{np.random.choice(['His', 'Asp', 'Glu', 'Met'])}"
-            })
-            variant_id_counter += 1
-    
-    variants_df = pd.DataFrame(variants)
+            yield pd.DataFrame({
+                'variant_id': np.char.add('VAR_', np.char.zfill(variant_ids.astype(str), 8)),
+                'mrn': np.repeat(mrns, n_variants),
+                'gene': draw_categorical(genes, total_variants, rng),
+                'assessment': draw_categorical(assessments, total_variants, rng, p=[0.15, 0.10, 0.50, 0.15, 0.10]),
+                'actionability': pd.Categorical.from_codes(
+                    actionability_codes[rng.integers(0, len(actionability_codes), size=total_variants)],
+                    categories=actionability_levels),
+                'allelefraction': rng.uniform(0.05, 0.95, size=total_variants),
+                'chromosome': rng.integers(1, 23, size=total_variants),
+                'position': rng.integers(1000000, 250000000, size=total_variants),
+                'protein_change': protein_change
+            }).astype(VARIANT_DTYPES)
+    
+    n_variant_rows = write_csv_chunks(variant_chunks(), f"{output_dir}/variants_with_50_demo_mrn_{n_patients}pts.csv")
     
     # ═══════════════════════════════════════════════════════════════
     # 3. PROTOCOLS (20-300 patients each)
@@ -91,19 +159,15 @@ def generate_scalable_synthetic_data(n_patients, output_dir="./"):
     
     # Estimate: if average patient is in 2 protocols, and average protocol has 160 patients
     # We need roughly (n_patients * 2) / 160 protocols
-    estimated_protocols = max(10, min(200, (n_patients * 2) // 160))
+    estimated_protocols = protocol_count(n_patients)
     
-    protocols = []
-    for i in range(estimated_protocols):
-        protocols.append({
-            'protocol_id': f"PROT_{i+1:03d}",
-            'protocol_name': f"Clinical Trial Protocol {i+1}",
-            'phase': np.random.choice(['Phase I', 'Phase II', 'Phase III'], p=[0.3, 0.5, 0.2]),
-            'status': np.random.choice(['Active', 'Completed'], p=[0.7, 0.3]),
-            'target_enrollment': np.random.randint(20, 301)  # 20-300 as specified
-        })
-    
-    protocols_df = pd.DataFrame(protocols)
+    protocols_df = pd.DataFrame({
+        'protocol_id': np.char.add('PROT_', np.char.zfill(np.arange(1, estimated_protocols + 1).astype(str), 3)),
+        'protocol_name': np.char.add('Clinical Trial Protocol ', np.arange(1, estimated_protocols + 1).astype(str)),
+        'phase': draw_categorical(['Phase I', 'Phase II', 'Phase III'], estimated_protocols, rng, p=[0.3, 0.5, 0.2]),
+        'status': draw_categorical(['Active', 'Completed'], estimated_protocols, rng, p=[0.7, 0.3]),
+        'target_enrollment': rng.integers(20, 301, size=estimated_protocols)  # 20-300 as specified
+    })
     
     # ═══════════════════════════════════════════════════════════════
     # 4. CLINICAL TRIAL SUBJECTS (1-3 protocols per patient)
@@ -111,34 +175,21 @@ def generate_scalable_synthetic_data(n_patients, output_dir="./"):
     
     print("   👥 Generating clinical trial subjects (1-3 protocols per patient)...")
     
-    clinical_trial_subjects = []
-    rave_id_counter = 100000
+    # Each patient enrolled in 1-3 distinct protocols as specified, drawn for all patients at once
+    n_enrollments = rng.choice([1, 2, 3], size=n_patients, p=[0.5, 0.3, 0.2])
+    rows, protocol_ids = sample_without_replacement(n_enrollments, protocols_df['protocol_id'], rng)
     
-    for patient in patients:
-        mrn = patient['mrn']
-        
-        # Each patient enrolled in 1-3 protocols as specified
-        n_enrollments = np.random.choice([1, 2, 3], p=[0.5, 0.3, 0.2])
-        
-        # Select random protocols for this patient
-        available_protocols = protocols_df['protocol_id'].tolist()
-        selected_protocols = np.random.choice(
-            available_protocols, 
-            size=min(n_enrollments, len(available_protocols)), 
-            replace=False
-        )
-        
-        for protocol_id in selected_protocols:
-            clinical_trial_subjects.append({
-                'rave_id': f"RAVE_{rave_id_counter}",
-                'mrn': mrn,
-                'protocol_id': protocol_id,
-                'enrollment_date': np.random.choice(pd.date_range('2020-01-01', '2024-12-31')),
-                'enrollment_status': np.random.choice(['Active', 'Completed', 'Withdrawn'], p=[0.5, 0.3, 0.2])
-            })
-            rave_id_counter += 1
-    
-    subjects_df = pd.DataFrame(clinical_trial_subjects)
+    # Enrollment dates are whole-day offsets into 2020-2024
+    first_day = np.datetime64('2020-01-01')
+    n_days = (np.datetime64('2024-12-31') - first_day).astype(int) + 1
+    
+    subjects_df = pd.DataFrame({
+        'rave_id': np.char.add('RAVE_', np.arange(100000, 100000 + len(rows)).astype(str)),
+        'mrn': patients_df['mrn'].to_numpy()[rows],
+        'protocol_id': protocol_ids,
+        'enrollment_date': first_day + rng.integers(0, n_days, size=len(rows)).astype('timedelta64[D]'),
+        'enrollment_status': draw_categorical(['Active', 'Completed', 'Withdrawn'], len(rows), rng, p=[0.5, 0.3, 0.2])
+    })
     
     # ═══════════════════════════════════════════════════════════════
     # 5. INTERVENTIONS (1-3 per clinical trial subject)
@@ -152,30 +203,23 @@ def generate_scalable_synthetic_data(n_patients, output_dir="./"):
         'Hormone Therapy', 'CAR-T Cell Therapy'
     ]
     
-    interventions = []
-    
-    for _, subject in subjects_df.iterrows():
-        rave_id = subject['rave_id']
-        
-        # 1-3 interventions per clinical trial subject as specified
-        n_interventions = np.random.choice([1, 2, 3], p=[0.5, 0.3, 0.2])
-        
-        selected_interventions = np.random.choice(
-            intervention_categories,
-            size=min(n_interventions, len(intervention_categories)),
-            replace=False
-        )
-        
-        for intervention in selected_interventions:
-            interventions.append({
-                'rave_id': rave_id,
-                'intervention_category': intervention,
-                'dose_level': np.random.choice(['Low', 'Medium', 'High']),
-                'start_date': subject['enrollment_date'] + pd.Timedelta(days=np.random.randint(0, 30)),
-                'duration_days': np.random.randint(30, 365)
-            })
+    def intervention_chunks():
+        # 1-3 distinct interventions per clinical trial subject as specified, drawn for a block of subjects at a time
+        for start in range(0, len(subjects_df), CHUNK_SIZE):
+            block = subjects_df.iloc[start:start + CHUNK_SIZE]
+            n_interventions = rng.choice([1, 2, 3], size=len(block), p=[0.5, 0.3, 0.2])
+            rows, category_codes = sample_without_replacement(n_interventions, np.arange(len(intervention_categories)), rng)
+            
+            yield pd.DataFrame({
+                'rave_id': block['rave_id'].to_numpy()[rows],
+                'intervention_category': pd.Categorical.from_codes(category_codes, categories=intervention_categories),
+                'dose_level': draw_categorical(['Low', 'Medium', 'High'], len(rows), rng),
+                'start_date': block['enrollment_date'].to_numpy()[rows]
+                              + rng.integers(0, 30, size=len(rows)).astype('timedelta64[D]'),
+                'duration_days': rng.integers(30, 365, size=len(rows))
+            }).astype(INTERVENTION_DTYPES)
     
-    interventions_df = pd.DataFrame(interventions)
+    n_intervention_rows = write_csv_chunks(intervention_chunks(), f"{output_dir}/interventions_{n_patients}pts.csv")
     
     # ═══════════════════════════════════════════════════════════════
     # 6. ADVERSE EVENTS (1-10 per clinical trial subject)
@@ -198,75 +242,130 @@ def generate_scalable_synthetic_data(n_patients, output_dir="./"):
         'Skin and subcutaneous tissue disorders'
     ]
     
-    adverse_events = []
-    
-    for _, subject in subjects_df.iterrows():
-        rave_id = subject['rave_id']
-        
-        # 1-10 adverse events per clinical trial subject as specified
-        n_adverse_events = np.random.choice(range(1, 11), p=[0.2, 0.2, 0.15, 0.15, 0.1, 0.08, 0.05, 0.03, 0.02, 0.02])
-        
-        selected_aes = np.random.choice(
-            ae_body_systems,
-            size=min(n_adverse_events, len(ae_body_systems)),
-            replace=True  # Can have multiple AEs in same body system
-        )
-        
-        for ae_system in selected_aes:
-            adverse_events.append({
-                'rave_id': rave_id,
-                'ae_body_system': ae_system,
-                'grade': np.random.choice([1, 2, 3, 4, 5], p=[0.4, 0.3, 0.2, 0.08, 0.02]),
-                'serious': np.random.choice([True, False], p=[0.15, 0.85]),
-                'onset_date': subject['enrollment_date'] + pd.Timedelta(days=np.random.randint(1, 200))
-            })
+    def adverse_event_chunks():
+        # 1-10 adverse events per clinical trial subject as specified, drawn for a block of subjects at a time
+        for start in range(0, len(subjects_df), CHUNK_SIZE):
+            block = subjects_df.iloc[start:start + CHUNK_SIZE]
+            n_adverse_events = rng.choice(range(1, 11), size=len(block),
+                                          p=[0.2, 0.2, 0.15, 0.15, 0.1, 0.08, 0.05, 0.03, 0.02, 0.02])
+            rows = np.repeat(np.arange(len(block)), np.minimum(n_adverse_events, len(ae_body_systems)))
+            
+            yield pd.DataFrame({
+                'rave_id': block['rave_id'].to_numpy()[rows],
+                'ae_body_system': draw_categorical(ae_body_systems, len(rows), rng),  # Can have multiple AEs in same body system
+                'grade': rng.choice([1, 2, 3, 4, 5], size=len(rows), p=[0.4, 0.3, 0.2, 0.08, 0.02]),
+                'serious': rng.choice([True, False], size=len(rows), p=[0.15, 0.85]),
+                'onset_date': block['enrollment_date'].to_numpy()[rows]
+                              + rng.integers(1, 200, size=len(rows)).astype('timedelta64[D]')
+            }).astype(ADVERSE_EVENT_DTYPES)
     
-    adverse_events_df = pd.DataFrame(adverse_events)
+    n_adverse_event_rows = write_csv_chunks(adverse_event_chunks(), f"{output_dir}/adverse_events_{n_patients}pts.csv")
     
     # ═══════════════════════════════════════════════════════════════
     # 7. SAVE ALL DATA
     # ═══════════════════════════════════════════════════════════════
     
-
-    print("   💾 Saving data files...")
-
-# Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
-
-    patients_df.to_csv(f"{output_dir}/clean_demographics_{n_patients}pts.csv", index=False)
-# ... rest of the save operations
-    
-    
     print("   💾 Saving data files...")
     
-    patients_df.to_csv(f"{output_dir}/clean_demographics_{n_patients}pts.csv", index=False)
-    variants_df.to_csv(f"{output_dir}/variants_with_50_demo_mrn_{n_patients}pts.csv", index=False)
-    protocols_df.to_csv(f"{output_dir}/protocols_{n_patients}pts.csv", index=False)
-    subjects_df.to_csv(f"{output_dir}/clinical_trial_subjects_{n_patients}pts.csv", index=False)
-    interventions_df.to_csv(f"{output_dir}/interventions_{n_patients}pts.csv", index=False)
-    adverse_events_df.to_csv(f"{output_dir}/adverse_events_{n_patients}pts.csv", index=False)
+    # Variants, interventions and adverse events were already streamed out block by block above
+    write_csv(patients_df, f"{output_dir}/clean_demographics_{n_patients}pts.csv")
+    write_csv(protocols_df, f"{output_dir}/protocols_{n_patients}pts.csv")
+    write_csv(subjects_df, f"{output_dir}/clinical_trial_subjects_{n_patients}pts.csv")
     
     # ═══════════════════════════════════════════════════════════════
     # 8. SUMMARY STATISTICS
     # ═══════════════════════════════════════════════════════════════
     
+    # The streamed tables are never held in memory whole, so the summary (and the return value) is row counts
+    counts = {
+        'patients': len(patients_df),
+        'variants': n_variant_rows,
+        'protocols': len(protocols_df),
+        'subjects': len(subjects_df),
+        'interventions': n_intervention_rows,
+        'adverse_events': n_adverse_event_rows
+    }
+    
     print(f"\n✅ Successfully generated data for {n_patients} patients!")
     print(f"📊 Summary Statistics:")
-    print(f"   - Patients: {len(patients_df):,}")
-    print(f"   - Variants: {len(variants_df):,} ({len(variants_df)/len(patients_df):.1f} per patient)")
-    print(f"   - Protocols: {len(protocols_df):,}")
-    print(f"   - Clinical Trial Subjects: {len(subjects_df):,} ({len(subjects_df)/len(patients_df):.1f} per patient)")
-    print(f"   - Interventions: {len(interventions_df):,} ({len(interventions_df)/len(subjects_df):.1f} per subject)")
-    print(f"   - Adverse Events: {len(adverse_events_df):,} ({len(adverse_events_df)/len(subjects_df):.1f} per subject)")
-    print(f"   - Total database records: {len(patients_df) + len(variants_df) + len(protocols_df) + len(subjects_df) + len(interventions_df) + len(adverse_events_df):,}")
+    print(f"   - Patients: {counts['patients']:,}")
+    print(f"   - Variants: {counts['variants']:,} ({counts['variants']/counts['patients']:.1f} per patient)")
+    print(f"   - Protocols: {counts['protocols']:,}")
+    print(f"   - Clinical Trial Subjects: {counts['subjects']:,} ({counts['subjects']/counts['patients']:.1f} per patient)")
+    print(f"   - Interventions: {counts['interventions']:,} ({counts['interventions']/counts['subjects']:.1f} per subject)")
+    print(f"   - Adverse Events: {counts['adverse_events']:,} ({counts['adverse_events']/counts['subjects']:.1f} per subject)")
+    print(f"   - Total database records: {sum(counts.values()):,}")
+    
+    return counts
+
+
+def copy_csv_rows(source_path, path, keep):
+    """Copy the header and the rows of source_path selected by the boolean Series keep, returning the row count
+    
+    No field in these files spans lines, so rows are copied line by line, keeping the source formatting exactly.
+    """
+    keep = keep.to_numpy()
+    selected = np.flatnonzero(keep)
+    n_lines = selected[-1] + 1 if len(selected) else 0  # Stop reading after the last selected row
+    
+    with open(source_path) as src, open(path, 'w') as dst:
+        dst.write(next(src))
+        dst.writelines(itertools.compress(itertools.islice(src, n_lines), keep[:n_lines]))
+    return len(selected)
+
+
+def read_slice_keys(source_dir, n_source):
+    """Read an existing n_source dataset's key columns (and its small subject and protocol tables), once, for slicing"""
+    source = lambda name: f"{source_dir}/{name}_{n_source}pts.csv"
+    read_keys = lambda name, columns: pd.read_csv(source(name), usecols=columns, engine='pyarrow')
     
     return {
-        'patients': patients_df,
-        'variants': variants_df,
-        'protocols': protocols_df,
-        'subjects': subjects_df,
-        'interventions': interventions_df,
-        'adverse_events': adverse_events_df
+        'patients': read_keys('clean_demographics', ['mrn'])['mrn'],
+        'variants': read_keys('variants_with_50_demo_mrn', ['mrn'])['mrn'],
+        'subjects': pd.read_csv(source('clinical_trial_subjects'), engine='pyarrow'),
+        'interventions': read_keys('interventions', ['rave_id'])['rave_id'],
+        'adverse_events': read_keys('adverse_events', ['rave_id'])['rave_id'],
+        'protocols': pd.read_csv(source('protocols'))
+    }
+
+
+def slice_dataset(keys, source_dir, n_source, n_patients, output_dir):
+    """Write the first n_patients patients of an existing n_source dataset, with every row linked to them, to output_dir
+    
+    The source subjects are enrolled across the largest scale's protocols, so each slice folds their protocol ids onto
+    the protocol_count(n_patients) protocols the generator would use at this scale, keeping protocol fan-in comparable
+    across scales. Enrollments that collapse onto a protocol the patient is already in are dropped, along with their
+    interventions and adverse events.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    source = lambda name: f"{source_dir}/{name}_{n_source}pts.csv"
+    target = lambda name: f"{output_dir}/{name}_{n_patients}pts.csv"
+    
+    # The slice is selected by MRN, and the trial tables through the kept subjects' RAVE IDs
+    mrns = keys['patients'].head(n_patients)
+    n_protocols = protocol_count(n_patients)
+    
+    subjects_df = keys['subjects'][keys['subjects']['mrn'].isin(mrns)].copy()
+    protocol_numbers = subjects_df['protocol_id'].str[len('PROT_'):].astype(int)
+    subjects_df['protocol_id'] = 'PROT_' + ((protocol_numbers - 1) % n_protocols + 1).astype(str).str.zfill(3)
+    subjects_df = subjects_df.drop_duplicates(subset=['mrn', 'protocol_id'])
+    rave_ids = subjects_df['rave_id']
+    
+    # The first n_protocols source protocols are PROT_001.. in order, exactly the ids the folded subjects use
+    protocols_df = keys['protocols'].head(n_protocols)
+    write_csv(subjects_df, target('clinical_trial_subjects'))
+    write_csv(protocols_df, target('protocols'))
+    
+    return {
+        'patients': copy_csv_rows(source('clean_demographics'), target('clean_demographics'), keys['patients'].isin(mrns)),
+        'variants': copy_csv_rows(source('variants_with_50_demo_mrn'), target('variants_with_50_demo_mrn'),
+                                  keys['variants'].isin(mrns)),
+        'protocols': len(protocols_df),
+        'subjects': len(subjects_df),
+        'interventions': copy_csv_rows(source('interventions'), target('interventions'),
+                                       keys['interventions'].isin(rave_ids)),
+        'adverse_events': copy_csv_rows(source('adverse_events'), target('adverse_events'),
+                                        keys['adverse_events'].isin(rave_ids))
     }
 
 
@@ -279,22 +378,32 @@ def generate_test_datasets():
     print("🚀 Generating test datasets for performance study...")
     print(f"📈 Scales to test: {test_sizes}")
     
-    for n_patients in test_sizes:
-        print(f"\n{'='*60}")
-        print(f"📊 Generating dataset for {n_patients:,} patients")
-        print(f"{'='*60}")
+    # Only the largest scale is generated; MRNs are sequential, so every smaller scale is its first n patients
+    # (with enrollments folded onto that scale's own protocol count)
+    largest = max(test_sizes)
+    source_dir = f"./test_data_{largest}pts"
+    try:
+        counts = generate_scalable_synthetic_data(largest, output_dir=source_dir)
+        print(f"✅ Successfully created test dataset for {largest:,} patients ({sum(counts.values()):,} records)")
+        
+    except Exception as e:
+        print(f"❌ Failed to generate dataset for {largest:,} patients: {e}")
+        return
+    
+    keys = read_slice_keys(source_dir, largest)
+    for n_patients in sorted(test_sizes, reverse=True):
+        if n_patients == largest:
+            continue
         
         try:
-            generate_scalable_synthetic_data(n_patients, output_dir=f"./test_data_{n_patients}pts")
-            print(f"✅ Successfully created test dataset for {n_patients:,} patients")
-            
+            counts = slice_dataset(keys, source_dir, largest, n_patients, output_dir=f"./test_data_{n_patients}pts")
+            print(f"✅ Successfully created test dataset for {n_patients:,} patients ({sum(counts.values()):,} records)")
+        
         except Exception as e:
             print(f"❌ Failed to generate dataset for {n_patients:,} patients: {e}")
-            break
     
     print(f"\n🎉 Test dataset generation complete!")
 
-
 if __name__ == "__main__":
     # Option 1: Generate single dataset for current app
     print("Choose generation mode:")